@@ -1,9 +1,10 @@
 from .peak_to_peak import find_peak_to_peak
 from .cropped_mean import  find_cropped_mean
-from .turbulence_properties import calculate_turbulence_properties
+from .turbulence_properties import calculate_turbulence_properties, calculate_probe_turbulence_properties
 from .crop_arrays import crop_array_by_array
-from .phase_average import phase_average_array
+from .phase_average import phase_average_array, PhaseAverager
 from .crop_probe import crop_probe_data
 from .filter_signal import low_pass_filter_arr
+from .single_frequency_dft import single_frequency_dft
 
-__all__ = ["find_peak_to_peak", "find_cropped_mean", "calculate_turbulence_properties", "crop_array_by_array", "phase_average_array", "crop_probe_data", "low_pass_filter_arr"]
+__all__ = ["find_peak_to_peak", "find_cropped_mean", "calculate_turbulence_properties", "calculate_probe_turbulence_properties", "crop_array_by_array", "phase_average_array", "PhaseAverager", "crop_probe_data", "low_pass_filter_arr", "single_frequency_dft"]
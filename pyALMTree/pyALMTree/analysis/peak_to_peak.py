@@ -1,18 +1,29 @@
 import numpy as np
+from .single_frequency_dft import single_frequency_dft
 
 def find_peak_to_peak(t_arr, y_arr, frequency, cut_time):
+    """
+    Peak to peak amplitude of the signal (or each of a stack of signals) at a frequency, taken from
+    the DFT at the bin frequency closest to it after cut_time.
 
+    Args:
+        t_arr (np.ndarray): Array of uniformly spaced times.
+        y_arr (np.ndarray): Signal, or array of signals along the last axis.
+        frequency (float): Frequency given in Hz.
+        cut_time (float): Only the samples after this time are used.
+
+    Returns:
+        float: Peak to peak amplitude (an array of them for a stack of signals).
+    """
     y_arr = np.array(y_arr)
     t_arr = np.array(t_arr)
 
-    y_arr = y_arr[t_arr > cut_time]
+    y_arr = y_arr[..., t_arr > cut_time]
     t_arr = t_arr[t_arr > cut_time]
 
     fs = 1.0 / (t_arr[1] - t_arr[0])
     n = len(t_arr)
 
-    y_arr_FT = np.fft.fft(y_arr)
-    freq = np.fft.fftfreq(n, d=t_arr[1] - t_arr[0])
-
-    index = np.argmin(np.abs(freq - frequency))
-    return 4.0 / n * np.abs(y_arr_FT[index])
+    # only the DFT bin closest to the frequency is needed
+    bin_frequency = np.rint(frequency * n / fs) * fs / n
+    return 4.0 / n * np.abs(single_frequency_dft(y_arr, bin_frequency, fs))
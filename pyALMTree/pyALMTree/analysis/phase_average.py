@@ -1,6 +1,7 @@
 import numpy as np
 from typing import Tuple
 import copy
+from .single_frequency_dft import single_frequency_dft
 
 
 class PhaseAverageResult:
@@ -21,12 +22,17 @@ def phase_average_array(
     bin_center_offset: float = None,
     include_0_and_360: bool = True,
     remove_phase_offset=False,
+    return_binned_values: bool = True,
 ) -> PhaseAverageResult:
     """
     Phase averaged in input arrays stored within y_arrs using the times defined in t_arr.
     Note: y_arrs will contain many arrays so if you intend to only phase average a single
     array please pass this inside another array.
 
+    The bin of every time is found once and shared by all of y_arrs (unless remove_phase_offset is
+    used), and the counts, sums and squared deviations of each bin are bincount reductions rather
+    than a mask per bin.
+
     Args:
         t_arr (np.ndarray): Array of times.
         y_arrs (np.ndarray): Array of arrays to phase average.
@@ -35,6 +41,8 @@ def phase_average_array(
         number_of_bins (int, optional): Number of bins. Defaults to 45.
         bin_center_offset (float, optional): Shifts the bin midpoints to the right (it must be positive). Default to half the bin width.
         include_0_and_360 (bool, optional): If 0 is a bin midpoint then the output arrays contain both 0 and 360 bins. Defaults to False.
+        return_binned_values (bool, optional): Also return the values of each bin in binned_values,
+                                               which holds a copy of y_arrs. Defaults to True.
 
 
     Returns:
@@ -43,8 +51,218 @@ def phase_average_array(
 
     result = PhaseAverageResult()
 
-    phase_arr = (np.degrees(2 * np.pi * frequency * t_arr) +
-                 phase_offset) % 360
+    phase_arr = _phase(t_arr, frequency, phase_offset)
+    bins, bin_midpoints, bin_center_offset = _phase_bins(number_of_bins, bin_center_offset)
+
+    y_block = np.asarray(y_arrs, dtype=np.float64).reshape(len(y_arrs), -1)
+
+    if remove_phase_offset:
+        # first find phase angle of every array at the DFT bin of the frequency
+        fs = 1.0/np.mean(np.diff(t_arr))
+        frequencies = np.fft.fftfreq(y_block.shape[1], 1/fs)
+        index = np.argmax(np.abs(frequencies - frequency) < 1e-3)
+        y_arr_phases = np.degrees(
+            np.angle(single_frequency_dft(y_block, frequencies[index], fs))
+        ) + 90
+
+        bin_inds = [
+            np.digitize(np.mod(phase_arr + y_arr_phase, 360), bins) for y_arr_phase in y_arr_phases
+        ]
+    else:
+        # the same bins for every array
+        bin_inds = [np.digitize(phase_arr, bins)] * len(y_block)
+
+    number_of_groups = number_of_bins + 1 if bin_center_offset == 0 else number_of_bins
+
+    phase_averaged_y_arrs = np.zeros((len(y_block), number_of_groups))
+    phase_averaged_y_arrs_std = np.zeros((len(y_block), number_of_groups))
+    bin_counts = np.zeros((len(y_block), number_of_groups), dtype=np.int64)
+    binned_y_arrs = []
+
+    groups = None
+    for i, y_arr in enumerate(y_block):
+        if groups is None or bin_inds[i] is not bin_inds[i - 1]:
+            groups, order = _bin_groups(
+                bin_inds[i], number_of_bins, bin_center_offset != 0, return_binned_values
+            )
+            counts = np.bincount(groups, minlength=number_of_groups + 1)
+
+        # the last group holds the values outside every bin
+        means = np.bincount(groups, y_arr, number_of_groups + 1) / np.maximum(counts, 1)
+        squares = np.bincount(groups, (y_arr - means[groups]) ** 2, number_of_groups + 1)
+
+        bin_counts[i] = counts[:-1]
+        phase_averaged_y_arrs[i] = means[:-1]
+        phase_averaged_y_arrs_std[i] = np.sqrt(squares[:-1] / np.maximum(counts[:-1], 1))
+
+        if return_binned_values:
+            # note cant be a numpy array since non uniform lengths
+            binned_y_arrs.append(np.split(y_arr[order], np.cumsum(counts)[:-1])[:-1])
+
+    bin_midpoints, phase_averaged_y_arrs, phase_averaged_y_arrs_std = _sort_bins(
+        bin_midpoints, phase_averaged_y_arrs, phase_averaged_y_arrs_std, include_0_and_360
+    )
+
+    result.bin_midpoints = np.array(bin_midpoints)
+    if return_binned_values:
+        result.binned_values = binned_y_arrs
+    result.phase_averaged_arrs = np.array(phase_averaged_y_arrs)
+    result.phase_averaged_std_arrs = np.array(phase_averaged_y_arrs_std)
+    result.bin_counts = bin_counts
+
+    return result
+
+
+class PhaseAverager:
+    """
+    Phase average arrays fed chunk by chunk, for signals too long to hold in memory or still being
+    written (e.g. probes read in time windows or a running case).
+
+    Only the count, mean and sum of squared deviations (M2) of every bin are kept. Each chunk is
+    reduced with bincount and folded in with Chan et al.'s parallel algorithm, so two averagers fed
+    different chunks can be combined with merge. finalise gives the phase_average_array result of
+    all the chunks (without binned_values).
+
+    Attributes:
+        count (np.ndarray): Number of samples in each bin (the same for every array).
+        mean (np.ndarray): (n_arrays, n_bins) running mean of each bin.
+        M2 (np.ndarray): (n_arrays, n_bins) running sum of squared deviations from the mean.
+    """
+
+    def __init__(
+        self,
+        frequency: float,
+        phase_offset: float = 0,
+        number_of_bins: int = 45,
+        bin_center_offset: float = None,
+    ):
+        """
+        Args:
+            frequency (float): Frequency to phase average given in Hz.
+            phase_offset (float, optional): The phase when t=0. Defaults to 0.
+            number_of_bins (int, optional): Number of bins. Defaults to 45.
+            bin_center_offset (float, optional): Shifts the bin midpoints to the right (it must be positive). Default to half the bin width.
+        """
+        self.frequency = frequency
+        self.phase_offset = phase_offset
+        self.number_of_bins = number_of_bins
+        self.bins, self.bin_midpoints, self.bin_center_offset = _phase_bins(
+            number_of_bins, bin_center_offset
+        )
+        self._number_of_groups = (
+            number_of_bins + 1 if self.bin_center_offset == 0 else number_of_bins
+        )
+
+        # sized by the number of arrays in the first chunk
+        self.count = np.zeros(self._number_of_groups, dtype=np.int64)
+        self.mean = None
+        self.M2 = None
+
+    def update(self, t_arr: np.ndarray, y_arrs: np.ndarray):
+        """
+        Fold a chunk of samples into the bins.
+
+        Args:
+            t_arr (np.ndarray): Times of the chunk.
+            y_arrs (np.ndarray): Array of arrays with the values at t_arr.
+
+        Raises:
+            ValueError: If the number of arrays differs from the previous chunks.
+        """
+        y_block = np.asarray(y_arrs, dtype=np.float64).reshape(len(y_arrs), -1)
+        self._allocate(len(y_block))
+
+        groups, _ = _bin_groups(
+            np.digitize(_phase(np.asarray(t_arr), self.frequency, self.phase_offset), self.bins),
+            self.number_of_bins,
+            self.bin_center_offset != 0,
+            False,
+        )
+
+        # statistics of the chunk, the last group holding the values outside every bin
+        n = self._number_of_groups + 1
+        counts = np.bincount(groups, minlength=n)
+        means = np.empty((len(y_block), n))
+        M2s = np.empty((len(y_block), n))
+        for i, y_arr in enumerate(y_block):
+            means[i] = np.bincount(groups, y_arr, n) / np.maximum(counts, 1)
+            M2s[i] = np.bincount(groups, (y_arr - means[i, groups]) ** 2, n)
+
+        self._fold(counts[:-1], means[:, :-1], M2s[:, :-1])
+
+    def merge(self, other: "PhaseAverager"):
+        """
+        Fold the samples of another averager into this one.
+
+        Args:
+            other (PhaseAverager): Averager with the same frequency, phase offset and bins.
+
+        Raises:
+            ValueError: If the averagers are set up differently or hold different numbers of arrays.
+        """
+        if (
+            self.frequency != other.frequency
+            or self.phase_offset != other.phase_offset
+            or not np.array_equal(self.bins, other.bins)
+        ):
+            raise ValueError("Cannot merge phase averagers with different frequencies or bins")
+        if other.mean is None:
+            return
+        self._allocate(len(other.mean))
+        self._fold(other.count, other.mean, other.M2)
+
+    def finalise(self, include_0_and_360: bool = True) -> PhaseAverageResult:
+        """
+        Args:
+            include_0_and_360 (bool, optional): If 0 is a bin midpoint then the output arrays contain both 0 and 360 bins. Defaults to True.
+
+        Returns:
+            PhaseAverageResult: bin_midpoints, phase_averaged_arrs, phase_averaged_std_arrs and bin_counts
+                                as from phase_average_array. Empty bins have a mean and std of 0.
+        """
+        result = PhaseAverageResult()
+        if self.mean is None:
+            return result
+
+        means = np.where(self.count > 0, self.mean, 0)
+        stds = np.sqrt(self.M2 / np.maximum(self.count, 1))
+        bin_midpoints, means, stds = _sort_bins(self.bin_midpoints, means, stds, include_0_and_360)
+        result.bin_midpoints = bin_midpoints
+        result.phase_averaged_arrs = means
+        result.phase_averaged_std_arrs = stds
+        result.bin_counts = np.tile(self.count, (len(self.mean), 1))
+        return result
+
+    def _allocate(self, number_of_arrays):
+        if self.mean is None:
+            self.mean = np.zeros((number_of_arrays, self._number_of_groups))
+            self.M2 = np.zeros((number_of_arrays, self._number_of_groups))
+        elif len(self.mean) != number_of_arrays:
+            raise ValueError(
+                f"{number_of_arrays} arrays given to a phase averager of {len(self.mean)} arrays"
+            )
+
+    def _fold(self, counts, means, M2s):
+        total = self.count + counts
+        delta = means - self.mean
+        with np.errstate(invalid="ignore", divide="ignore"):
+            weight = np.where(total > 0, counts / total, 0)
+            cross = np.where(total > 0, self.count * counts / total, 0)
+        self.mean += delta * weight
+        self.M2 += M2s + delta**2 * cross
+        self.count = total
+
+
+def _phase(t_arr, frequency, phase_offset):
+    return (np.degrees(2 * np.pi * frequency * t_arr) + phase_offset) % 360
+
+
+def _phase_bins(number_of_bins, bin_center_offset):
+    """
+    Returns:
+        tuple: (bins, bin_midpoints, bin_center_offset) with the bin edges for np.digitize, where an
+               offset set of bins starts with an extra [0, first edge) bin that wraps into the last.
+    """
     bins = np.linspace(0, 360, number_of_bins + 1)
     bin_midpoints = (bins[1:] + bins[0:-1]) * 0.5
 
@@ -65,54 +283,10 @@ def phase_average_array(
             bins = np.insert(bins, 0, 0)
             bins[-1] = 360
 
-    if remove_phase_offset:
-        binned_y_arrs = []
-
-        # first find phase angle
-        fs = 1.0/np.mean(np.diff(t_arr))
-        for ind, y_arr in enumerate(y_arrs):
-            frequencies = np.fft.fftfreq(len(y_arr), 1/fs)
-            fft_values = np.fft.fft(y_arr)
-            index = np.argmax(np.abs(frequencies - frequency) < 1e-3)
-            y_arr_phase = np.degrees(np.angle(fft_values[index])) + 90
-
-            bin_inds = np.digitize(np.mod(phase_arr + y_arr_phase, 360), bins)
-
-            # note cant be a numpy array since non uniform lengths
-            binned_y_arrs.append([y_arr[bin_inds == i] for i in range(1, number_of_bins + 2)])
-
-    else:
-        bin_inds = np.digitize(phase_arr, bins)
-
-        # note cant be a numpy array since non uniform lengths
-        binned_y_arrs = [
-            [y_arr[bin_inds == i] for i in range(1, number_of_bins + 2)] for y_arr in y_arrs
-        ]
-
-    if bin_center_offset != 0:
-        for i in range(len(y_arrs)):
-
-            # combine final array elements into last array
-            binned_y_arrs[i][-1] = np.concatenate(
-                (binned_y_arrs[i][0], binned_y_arrs[i][-1])
-            )
+    return bins, bin_midpoints, bin_center_offset
 
-            # remove first array from list
-            binned_y_arrs[i] = binned_y_arrs[i][1:]
-
-    phase_averaged_y_arrs_std = np.array(
-        [
-            [np.std(group) if len(group) > 0 else 0 for group in binned_y_arr]
-            for binned_y_arr in binned_y_arrs
-        ]
-    )
-    phase_averaged_y_arrs = np.array(
-        [
-            [np.mean(group) if len(group) > 0 else 0 for group in binned_y_arr]
-            for binned_y_arr in binned_y_arrs
-        ]
-    )
 
+def _sort_bins(bin_midpoints, phase_averaged_y_arrs, phase_averaged_y_arrs_std, include_0_and_360):
     sorted_bin_midpoints_inds = np.argsort(bin_midpoints)
     bin_midpoints = bin_midpoints[sorted_bin_midpoints_inds]
     phase_averaged_y_arrs_std = phase_averaged_y_arrs_std[:,
@@ -131,15 +305,35 @@ def phase_average_array(
                 (phase_averaged_y_arrs_std, phase_averaged_y_arrs_std[:, 0])
             )
 
-    result.bin_midpoints = np.array(bin_midpoints)
-    result.binned_values = binned_y_arrs
-    result.phase_averaged_arrs = np.array(phase_averaged_y_arrs)
-    result.phase_averaged_std_arrs = np.array(phase_averaged_y_arrs_std)
-    result.bin_counts = np.array(
-        [[len(arr) for arr in binned_y_arr] for binned_y_arr in binned_y_arrs]
-    )
+    return bin_midpoints, phase_averaged_y_arrs, phase_averaged_y_arrs_std
 
-    return result
+
+def _bin_groups(bin_inds, number_of_bins, offset, return_order):
+    """
+    Group of every value from its np.digitize bin index. The first bin of an offset set of bins wraps
+    around into the last one, and the values outside every bin go into an extra final group.
+
+    Returns:
+        tuple: (groups, order) where order sorts the values by group, keeping them in time order within
+               each bin and the wrapped values ahead of the rest of the last bin (None if not
+               return_order).
+    """
+    groups = bin_inds - 1
+    number_of_groups = number_of_bins + 1
+    if offset:
+        wrapped = groups == 0
+        groups = groups - 1
+        groups[wrapped] = number_of_bins - 1
+        number_of_groups = number_of_bins
+    groups[(groups < 0) | (groups >= number_of_groups)] = number_of_groups
+
+    order = None
+    if return_order:
+        if offset:
+            order = np.argsort(2 * groups + ~wrapped, kind="stable")
+        else:
+            order = np.argsort(groups, kind="stable")
+    return groups, order
 
 
 if __name__ == "__main__":
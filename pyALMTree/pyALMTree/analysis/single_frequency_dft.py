@@ -0,0 +1,40 @@
+import numpy as np
+
+# number of samples projected at a time, bounding the memory of the complex exponential
+_BLOCK_SIZE = 1 << 16
+
+
+def single_frequency_dft(y_arrs: np.ndarray, frequency: float, fs: float) -> np.ndarray:
+    """
+    Discrete Fourier transform of every signal in y_arrs at a single frequency, i.e.
+    sum(y[n] * exp(-2j * pi * frequency * n / fs)).
+
+    Unlike reading one value of np.fft.fft this is O(N) per signal and the frequency does not have to
+    lie on a DFT bin. At the bin frequency k * fs / N it equals np.fft.fft(y)[k]. The signals are
+    projected onto the complex exponential in blocks of samples, so the extra memory does not grow
+    with the length or number of signals.
+
+    Args:
+        y_arrs (np.ndarray): Signal, or array of signals of equal length along the last axis.
+        frequency (float): Frequency to transform at given in Hz.
+        fs (float): Sampling frequency in Hz.
+
+    Returns:
+        np.ndarray: Complex DFT value of each signal, with the shape of y_arrs without its last axis
+                    (a complex scalar for a single signal).
+    """
+    y_arrs = np.asarray(y_arrs, dtype=np.float64)
+    n = y_arrs.shape[-1]
+    cycles_per_sample = frequency / fs
+
+    real = np.zeros(y_arrs.shape[:-1])
+    imag = np.zeros(y_arrs.shape[:-1])
+    for start in range(0, n, _BLOCK_SIZE):
+        samples = np.arange(start, min(start + _BLOCK_SIZE, n))
+        # reduce the phase to a single cycle before scaling so it stays accurate for long signals
+        phase = 2 * np.pi * np.mod(cycles_per_sample * samples, 1.0)
+        block = y_arrs[..., start : start + len(samples)]
+        real += block @ np.cos(phase)
+        imag -= block @ np.sin(phase)
+
+    return (real + 1j * imag)[()]
@@ -1,5 +1,8 @@
 import numpy as np
 
+# number of FFT values correlated at once when chunking probes, bounding the memory of each chunk
+_CHUNK_FFT_VALUES = 1 << 22
+
 
 class TurbulenceResult:
     def __init__(self):
@@ -9,45 +12,112 @@ class TurbulenceResult:
         self.U_mean = np.zeros(3)
         self.R = np.zeros((3, 3))
 
-def calculate_T(U_fluc_arr, V_fluc_arr, t_arr):
-    def R(u, v):
-        return np.mean((u * v)) / np.mean(u * u)
-    num_time_steps = len(U_fluc_arr)
-    ref_time_ind = num_time_steps // 2
 
-    tau_arr = np.arange(
-        ref_time_ind - num_time_steps + 1, num_time_steps - ref_time_ind - 1
+class ProbeTurbulenceResult:
+    def __init__(self):
+        self.k = np.array([])
+        self.T = np.empty((0, 3, 3))
+        self.U_mean = np.empty((0, 3))
+        self.R = np.empty((0, 3, 3))
+
+
+def calculate_T(U_fluc_arr, V_fluc_arr, t_arr, max_lag: int = None):
+    """
+    Integral timescale of the correlation of U_fluc_arr with V_fluc_arr, integrated between the zero
+    crossings either side of the reference lag.
+
+    The correlation at every lag is found at once with zero padded real FFTs (Wiener-Khinchin) rather
+    than a mean per lag. As before, positive lags correlate the first half of U_fluc_arr with the
+    shifted V_fluc_arr and negative lags the second half.
+
+    Args:
+        U_fluc_arr (np.ndarray): Fluctuating velocity signal.
+        V_fluc_arr (np.ndarray): Fluctuating velocity signal of the same length.
+        t_arr (np.ndarray): Array of uniformly spaced time values.
+        max_lag (int, optional): Largest lag in samples to compute and integrate over. Defaults to None
+                                 (every lag).
+
+    Returns:
+        float: Integral timescale.
+    """
+    taus, R_arr = _correlations(
+        np.asarray(U_fluc_arr)[None, :], np.asarray(V_fluc_arr)[None, :], max_lag
     )
-    R_arr = np.zeros_like(tau_arr, dtype=float)
+    return _integrate_T(taus, R_arr[0, 0], len(U_fluc_arr), t_arr)
 
-    for ind, tau in enumerate(tau_arr):
-        if tau >= 0:
-            R_arr[ind] = R(
-                U_fluc_arr[ref_time_ind:0:-1],
-                V_fluc_arr[ref_time_ind + tau : tau : -1],
-            )
-        elif tau < 0:
-            R_arr[ind] = R(
-                U_fluc_arr[ref_time_ind:num_time_steps],
-                V_fluc_arr[ref_time_ind + tau : num_time_steps + tau],
-            )
-        else:
-            raise ValueError("tau is misbehaving")
 
-    zero_crossings = np.where(np.diff(np.sign(R_arr)))[0]
-    zero_crossings = np.append(zero_crossings, num_time_steps)
-    zero_crossings = np.append(zero_crossings, 0)
+def _correlations(u_arrs, v_arrs, max_lag=None):
+    """
+    Correlation R[i, j](tau) = sum(u_i[m] * v_j[m + tau]) / sum(u_i[m] ** 2) of every pair of signals,
+    where m runs over the first half of the signals (1 to N // 2) for tau >= 0 and the second half
+    (N // 2 to N - 1) for tau < 0. Leading axes (e.g. probes) are broadcast.
+
+    Returns:
+        tuple: (taus, R) with the lags and the (..., n_u, n_v, n_taus) correlations.
+    """
+    num_time_steps = u_arrs.shape[-1]
+    ref_time_ind = num_time_steps // 2
+
+    tau_min = ref_time_ind - num_time_steps + 1
+    tau_max = num_time_steps - ref_time_ind - 2
+    if max_lag is not None:
+        if max_lag < 1:
+            raise ValueError("max_lag must be at least 1")
+        tau_min = max(tau_min, -max_lag)
+        tau_max = min(tau_max, max_lag)
+    taus = np.arange(tau_min, tau_max + 1)
+
+    n_fft = _fft_length(num_time_steps)
+    v_spectra = np.fft.rfft(v_arrs, n_fft)
+
+    R = np.empty(u_arrs.shape[:-1] + v_arrs.shape[-2:-1] + (len(taus),))
+    n_negative = np.count_nonzero(taus < 0)
+    for window, lags, fft_lags in (
+        # the negative lags sit at the end of the circular correlation
+        (slice(1, ref_time_ind + 1), slice(n_negative, None), slice(0, tau_max + 1)),
+        (slice(ref_time_ind, num_time_steps), slice(0, n_negative), slice(n_fft + tau_min, n_fft)),
+    ):
+        if lags.start == lags.stop:
+            continue
+        u_window = np.zeros_like(u_arrs, dtype=float)
+        u_window[..., window] = u_arrs[..., window]
+
+        correlations = np.fft.irfft(
+            np.conj(np.fft.rfft(u_window, n_fft))[..., :, None, :] * v_spectra[..., None, :, :],
+            n_fft,
+        )
+        denominators = np.sum(u_window**2, axis=-1)
+        R[..., lags] = correlations[..., fft_lags] / denominators[..., :, None, None]
+
+    return taus, R
+
+
+def _fft_length(num_time_steps):
+    # each half window correlation is nonzero over fewer than num_time_steps lags either side of its
+    # own lags, so zero padding to num_time_steps stops the circular correlation wrapping onto them
+    return 1 << int(np.ceil(np.log2(max(num_time_steps, 2))))
+
+
+def _integrate_T(taus, R_arr, num_time_steps, t_arr):
+    ref_time_ind = num_time_steps // 2
+
+    # work in indices of the uncapped lags, starting from ref_time_ind - num_time_steps + 1
+    offset = taus[0] - (ref_time_ind - num_time_steps + 1)
+
+    zero_crossings = np.where(np.diff(np.sign(R_arr)))[0] + offset
+    zero_crossings = np.append(zero_crossings, offset + len(R_arr))
+    zero_crossings = np.append(zero_crossings, offset)
 
     upper = np.min(zero_crossings[zero_crossings >= ref_time_ind])
     lower = np.max(zero_crossings[zero_crossings <= ref_time_ind])
 
     dt = t_arr[lower + 1] - t_arr[lower]
-    T = np.sum(R_arr[lower:upper] * dt)
+    T = np.sum(R_arr[lower - offset : upper - offset] * dt)
     return T
 
 
 def calculate_turbulence_properties(
-    t_arr: np.ndarray, U_arr: np.ndarray, t_limits: np.ndarray = [0,1000],
+    t_arr: np.ndarray, U_arr: np.ndarray, t_limits: np.ndarray = [0,1000], max_lag: int = None,
 ) -> TurbulenceResult:
     """
     Calculate k,L,T,R,U_mean and store it in a result output
@@ -56,6 +126,7 @@ def calculate_turbulence_properties(
         t_arr (np.ndarray): Array of time values.
         U_arr (np.ndarray): Array of (U,V,W) where U,V,W and the velocity time series signals.
         t_limits (np.ndarray): Array containing the limits of the analysis (i.e. [t_lower_limit, t_upper_limiit]). Defaults to [0,1000].
+        max_lag (int, optional): Largest lag in samples of the timescale correlations. Defaults to None (every lag).
 
     Returns:
         TurbulenceResult: Results (k,L,T,U_mean,R)
@@ -83,11 +154,183 @@ def calculate_turbulence_properties(
     k = 0.5 * np.trace(R)
     result.k = k
 
-    # Calculate timescale
+    # Calculate timescale, correlating every pair of components at once
     N = len(U_fluc_arr[0])
+    taus, R_arrs = _correlations(U_fluc_arr, U_fluc_arr, max_lag)
     for i in range(3):
         for j in range(3):
-            T = calculate_T(U_fluc_arr[i], U_fluc_arr[j], t_arr)
+            T = _integrate_T(taus, R_arrs[i, j], N, t_arr)
             result.T[i,j] = T
 
     return result
+
+
+def calculate_probe_turbulence_properties(
+    t_arr: np.ndarray,
+    U_arr: np.ndarray,
+    t_limits: np.ndarray = [0, 1000],
+    max_lag: int = None,
+    n_workers: int = 1,
+    chunk_size: int = None,
+) -> ProbeTurbulenceResult:
+    """
+    Calculate k, T, R and U_mean of every probe of a probe set at once, e.g. the values of
+    read.postProcessing_probe_array for a velocity probe set.
+
+    The times are cropped once for every probe and the probes are processed in chunks, each chunk
+    correlating all of its probes and component pairs together (see calculate_T).
+
+    Args:
+        t_arr (np.ndarray): Array of time values.
+        U_arr (np.ndarray): (n_times, n_probes, 3) array of the velocity at each probe.
+        t_limits (np.ndarray): Array containing the limits of the analysis (i.e. [t_lower_limit, t_upper_limiit]). Defaults to [0,1000].
+        max_lag (int, optional): Largest lag in samples of the timescale correlations. Defaults to None (every lag).
+        n_workers (int, optional): Number of processes working on the chunks at once. None uses one per
+                                   CPU. Defaults to 1 (serial).
+        chunk_size (int, optional): Number of probes in each chunk. Defaults to None in which case the
+                                    chunks are sized to bound their memory use.
+
+    Returns:
+        ProbeTurbulenceResult: U_mean (n_probes, 3), R (n_probes, 3, 3), k (n_probes,) and
+                               T (n_probes, 3, 3).
+    """
+    t_arr = np.asarray(t_arr)
+    time_inds = np.flatnonzero((t_arr > t_limits[0]) & (t_arr < t_limits[1]))
+    t_arr = t_arr[time_inds]
+    n_probes = U_arr.shape[1]
+
+    if chunk_size is None:
+        chunk_size = max(1, _CHUNK_FFT_VALUES // (9 * _fft_length(len(time_inds))))
+
+    # the time crop is taken chunk by chunk, so a memmapped U_arr is never read in full when serial
+    chunks = (
+        np.asarray(U_arr[:, start : start + chunk_size])[time_inds]
+        for start in range(0, n_probes, chunk_size)
+    )
+    if n_workers == 1 or n_probes <= chunk_size:
+        chunk_results = [_probe_chunk_turbulence(t_arr, chunk, max_lag) for chunk in chunks]
+    else:
+        from itertools import repeat
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            chunk_results = list(
+                executor.map(_probe_chunk_turbulence, repeat(t_arr), chunks, repeat(max_lag))
+            )
+
+    result = ProbeTurbulenceResult()
+    if len(chunk_results) > 0:
+        result.U_mean = np.concatenate([chunk.U_mean for chunk in chunk_results])
+        result.R = np.concatenate([chunk.R for chunk in chunk_results])
+        result.k = np.concatenate([chunk.k for chunk in chunk_results])
+        result.T = np.concatenate([chunk.T for chunk in chunk_results])
+    return result
+
+
+def _probe_chunk_turbulence(t_arr, U_arr, max_lag) -> ProbeTurbulenceResult:
+    result = ProbeTurbulenceResult()
+
+    # Mean velocity
+    result.U_mean = np.mean(U_arr, axis=0)
+
+    # Reynolds Stresses (Resolved), as (probe, component, time)
+    U_fluc_arr = np.ascontiguousarray(np.transpose(U_arr - result.U_mean[None, :, :], (1, 2, 0)))
+    result.R = np.einsum("pit,pjt->pij", U_fluc_arr, U_fluc_arr) / U_fluc_arr.shape[-1]
+
+    # TKE
+    result.k = 0.5 * np.trace(result.R, axis1=1, axis2=2)
+
+    # Calculate timescale, correlating every probe and pair of components at once
+    N = U_fluc_arr.shape[-1]
+    taus, R_arrs = _correlations(U_fluc_arr, U_fluc_arr, max_lag)
+    result.T = np.empty((len(U_fluc_arr), 3, 3))
+    for p in range(len(U_fluc_arr)):
+        for i in range(3):
+            for j in range(3):
+                result.T[p, i, j] = _integrate_T(taus, R_arrs[p, i, j], N, t_arr)
+
+    return result
+
+
+if __name__ == "__main__":
+    # check calculate_T against the original O(N^2) loop, which takes the mean of every lag in turn
+    import time
+
+    def calculate_T_direct(U_fluc_arr, V_fluc_arr, t_arr):
+        def R(u, v):
+            return np.mean((u * v)) / np.mean(u * u)
+        num_time_steps = len(U_fluc_arr)
+        ref_time_ind = num_time_steps // 2
+
+        tau_arr = np.arange(
+            ref_time_ind - num_time_steps + 1, num_time_steps - ref_time_ind - 1
+        )
+        R_arr = np.zeros_like(tau_arr, dtype=float)
+
+        for ind, tau in enumerate(tau_arr):
+            if tau >= 0:
+                R_arr[ind] = R(
+                    U_fluc_arr[ref_time_ind:0:-1],
+                    V_fluc_arr[ref_time_ind + tau : tau : -1],
+                )
+            elif tau < 0:
+                R_arr[ind] = R(
+                    U_fluc_arr[ref_time_ind:num_time_steps],
+                    V_fluc_arr[ref_time_ind + tau : num_time_steps + tau],
+                )
+            else:
+                raise ValueError("tau is misbehaving")
+
+        zero_crossings = np.where(np.diff(np.sign(R_arr)))[0]
+        zero_crossings = np.append(zero_crossings, num_time_steps)
+        zero_crossings = np.append(zero_crossings, 0)
+
+        upper = np.min(zero_crossings[zero_crossings >= ref_time_ind])
+        lower = np.max(zero_crossings[zero_crossings <= ref_time_ind])
+
+        dt = t_arr[lower + 1] - t_arr[lower]
+        T = np.sum(R_arr[lower:upper] * dt)
+        return T
+
+    rng = np.random.default_rng(0)
+
+    def ar1(number_of_samples, coefficient):
+        signal = np.zeros(number_of_samples)
+        noise = rng.standard_normal(number_of_samples)
+        for i in range(1, number_of_samples):
+            signal[i] = coefficient * signal[i - 1] + noise[i]
+        return signal
+
+    for number_of_samples in [5, 6, 401, 1024, 1025, 2000, 2001]:
+        t_arr = np.arange(number_of_samples) * 0.01
+        U_arr = np.array(
+            [
+                ar1(number_of_samples, 0.95),
+                ar1(number_of_samples, 0.8),
+                np.sin(3 * t_arr) + 0.3 * rng.standard_normal(number_of_samples),
+            ]
+        )
+        U_fluc_arr = U_arr - np.mean(U_arr, axis=1)[:, np.newaxis]
+
+        for i in range(3):
+            for j in range(3):
+                T_direct = calculate_T_direct(U_fluc_arr[i], U_fluc_arr[j], t_arr)
+                T = calculate_T(U_fluc_arr[i], U_fluc_arr[j], t_arr)
+                if not np.isclose(T, T_direct, rtol=1e-9, atol=1e-12):
+                    raise AssertionError(f"N={number_of_samples} ({i}, {j}): {T} != {T_direct}")
+        print(f"N={number_of_samples}: calculate_T matches the direct loop for all 9 pairs")
+
+    number_of_samples = 20000
+    t_arr = np.arange(number_of_samples) * 1e-3
+    u = ar1(number_of_samples, 0.99)
+    u = u - np.mean(u)
+
+    start = time.perf_counter()
+    calculate_T_direct(u, u, t_arr)
+    direct_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    calculate_T(u, u, t_arr)
+    fft_time = time.perf_counter() - start
+
+    print(f"N={number_of_samples}: direct loop {direct_time:.3f} s, FFT {fft_time:.4f} s")
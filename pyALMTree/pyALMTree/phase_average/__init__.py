@@ -1,2 +1,5 @@
 from . import organise_case
-from . import calculate
\ No newline at end of file
+from . import calculate
+from .fused import phase_average_case
+
+__all__ = ["organise_case", "calculate", "phase_average_case"]
@@ -1,2 +1,7 @@
 from .postProcessing import postProcessing
-from .turbineOutput import turbineOutput
\ No newline at end of file
+from .turbineOutput import (
+    turbineOutput,
+    blade_loads,
+    read_blade_load_result,
+    BladeLoadResult,
+)
@@ -0,0 +1,94 @@
+import numpy as np
+
+
+class WelfordAccumulator:
+    """
+    Running count, mean and sum of squared deviations (M2) of a stream of equally shaped arrays.
+
+    Each update is folded into preallocated float64 buffers in place (Welford's algorithm), so the
+    memory used is independent of the number of snapshots. Two accumulators can be combined with
+    merge (Chan et al.'s parallel algorithm).
+
+    Attributes:
+        count (int): Number of snapshots accumulated.
+        mean (np.ndarray): Running mean.
+        M2 (np.ndarray): Running sum of squared deviations from the mean.
+    """
+
+    def __init__(self, shape):
+        """
+        Args:
+            shape (tuple): Shape of each snapshot.
+        """
+        self.count = 0
+        self.mean = np.zeros(shape, dtype=np.float64)
+        self.M2 = np.zeros(shape, dtype=np.float64)
+        self._delta = np.empty(shape, dtype=np.float64)
+
+    def __getstate__(self):
+        # the scratch buffer is not worth sending to or from a worker process
+        state = self.__dict__.copy()
+        del state["_delta"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._delta = np.empty(self.mean.shape, dtype=np.float64)
+
+    def update(self, values: np.ndarray):
+        """
+        Fold a snapshot into the accumulator.
+
+        Args:
+            values (np.ndarray): Snapshot with the shape of the accumulator.
+        """
+        self.count += 1
+        delta = self._delta
+        np.subtract(values, self.mean, out=delta)
+        self.mean += delta / self.count
+        # M2 += (x - old mean) * (x - new mean)
+        delta *= values - self.mean
+        self.M2 += delta
+
+    def merge(self, other: "WelfordAccumulator"):
+        """
+        Fold the snapshots of another accumulator into this one.
+
+        Args:
+            other (WelfordAccumulator): Accumulator with the same shape.
+        """
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.count = other.count
+            self.mean[...] = other.mean
+            self.M2[...] = other.M2
+            return
+
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * (other.count / count)
+        self.M2 += other.M2 + delta**2 * (self.count * other.count / count)
+        self.count = count
+
+    def variance(self, ddof: int = 1) -> np.ndarray:
+        """
+        Args:
+            ddof (int, optional): Delta degrees of freedom. Defaults to 1 (sample variance).
+
+        Returns:
+            np.ndarray: Variance of the snapshots (NaN if count <= ddof).
+        """
+        if self.count <= ddof:
+            return np.full_like(self.M2, np.nan)
+        return self.M2 / (self.count - ddof)
+
+    def std(self, ddof: int = 1) -> np.ndarray:
+        """
+        Args:
+            ddof (int, optional): Delta degrees of freedom. Defaults to 1 (sample standard deviation).
+
+        Returns:
+            np.ndarray: Standard deviation of the snapshots (NaN if count <= ddof).
+        """
+        return np.sqrt(self.variance(ddof))
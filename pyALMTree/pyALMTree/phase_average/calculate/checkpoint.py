@@ -0,0 +1,76 @@
+import os
+import tempfile
+import numpy as np
+from .accumulator import WelfordAccumulator
+
+# name of the accumulator checkpoint written in each result/<sample type> directory
+CHECKPOINT_FILE_NAME = "checkpoint.npz"
+
+# bump this whenever the layout of the checkpoint changes
+CHECKPOINT_VERSION = 1
+
+
+def save_checkpoint(folder_path: str, columns, accumulators: dict, consumed: dict):
+    """
+    Save the accumulator state of every bin of a sample type together with the time directories
+    folded into each.
+
+    Args:
+        folder_path (str): Path to the result/<sample type> directory.
+        columns (list): Column names of the samples.
+        accumulators (dict): {bin: WelfordAccumulator}, all with the same shape.
+        consumed (dict): {bin: [time dir, ...]} of the time directories folded into each accumulator.
+    """
+    bins = list(accumulators.keys())
+    times = [consumed[bin] for bin in bins]
+
+    # write to a temporary file and move it into place so a reader never sees half a checkpoint
+    fd, tmp_path = tempfile.mkstemp(dir=folder_path, suffix=".npz.tmp")
+    with os.fdopen(fd, "wb") as f:
+        np.savez(
+            f,
+            version=np.array(CHECKPOINT_VERSION),
+            columns=np.array(columns, dtype=str),
+            bins=np.array(bins, dtype=str),
+            counts=np.array([accumulators[bin].count for bin in bins], dtype=np.int64),
+            mean=np.stack([accumulators[bin].mean for bin in bins]),
+            M2=np.stack([accumulators[bin].M2 for bin in bins]),
+            times=np.array([time for bin_times in times for time in bin_times], dtype=str),
+            time_bins=np.repeat(np.arange(len(bins)), [len(bin_times) for bin_times in times]),
+        )
+    os.replace(tmp_path, os.path.join(folder_path, CHECKPOINT_FILE_NAME))
+
+
+def load_checkpoint(folder_path: str):
+    """
+    Load the checkpoint written by save_checkpoint.
+
+    Args:
+        folder_path (str): Path to the result/<sample type> directory.
+
+    Returns:
+        tuple: (columns, {bin: (WelfordAccumulator, [time dir, ...])}) or None if there is no
+               checkpoint or it was written by an incompatible version.
+    """
+    checkpoint_path = os.path.join(folder_path, CHECKPOINT_FILE_NAME)
+    if not os.path.exists(checkpoint_path):
+        return None
+
+    with np.load(checkpoint_path, allow_pickle=False) as data:
+        if int(data["version"]) != CHECKPOINT_VERSION:
+            return None
+
+        # each access of an npz member reads it from the file again
+        columns = [str(column) for column in data["columns"]]
+        counts, mean, M2 = data["counts"], data["mean"], data["M2"]
+        times, time_bins = data["times"], data["time_bins"]
+
+        bins = {}
+        for i, bin in enumerate(data["bins"]):
+            accumulator = WelfordAccumulator(mean.shape[1:])
+            accumulator.count = int(counts[i])
+            accumulator.mean[...] = mean[i]
+            accumulator.M2[...] = M2[i]
+            bins[str(bin)] = (accumulator, [str(time) for time in times[time_bins == i]])
+
+    return columns, bins
@@ -1,63 +1,421 @@
+# number of consecutive snapshots of a file folded by one task, fixed so that the results do not
+# depend on the number of workers
+SLAB_SIZE = 64
+
+
 def postProcessing(
     case_path: str,
     calculate_samples: bool = True,
     calculate_surfaces: bool = True,
+    n_workers: int = 1,
+    resume: bool = True,
 ):
     """take the organised phaseAverage directory and calcualte the phase averaged results which is then stored in the results directory
 
+    The source files of each bin are taken from the manifest written by organise_case.postProcessing.
+    If there is no manifest the <function object>/<bin>/<file>/<time> directory tree is read instead.
+
+    The accumulator state of every bin is checkpointed in result/<sample type>/checkpoint.npz along with
+    the time directories it holds, so a rerun only reads the time directories added since.
+
+    In a multi turbine case every phaseAveraged-postProcessing-turbine<i> directory is calculated, with
+    each file read once and folded into the bin of every turbine.
+
     Args:
         case_path (str): Path to case.
         calculate_samples (bool, optional): Flag for calcualting the phase avereaged samples. Defaults to True.
         calculate_surfaces (bool, optional): flag for calcualting the pahse averaged surfaces. Defaults to True.
+        n_workers (int, optional): Number of processes averaging time slabs of the files at once.
+                                   None uses one per CPU. Defaults to 1 (serial).
+        resume (bool, optional): Continue from the checkpoints of a previous run. Defaults to True.
     """
     import os
+    from pyALMTree.phase_average.organise_case.rotation_angle import phaseAveraged_dir_names
+
+    # one directory per turbine in a multi turbine case, sharing a manifest
+    calculated = set()
+    for folder in phaseAveraged_dir_names(case_path, "postProcessing"):
+        if folder not in calculated:
+            calculated.update(
+                _calculate_phaseAveraged_folder(
+                    os.path.join(case_path, folder),
+                    case_path,
+                    calculate_samples,
+                    calculate_surfaces,
+                    n_workers,
+                    resume,
+                )
+            )
+
 
-    postProcessing_path = os.path.join(case_path, "phaseAveraged-postProcessing")
+def _calculate_phaseAveraged_folder(
+    postProcessing_path: str,
+    case_path: str,
+    calculate_samples: bool,
+    calculate_surfaces: bool,
+    n_workers: int,
+    resume: bool,
+) -> list:
+    """
+    Returns:
+        list: Name of every phaseAveraged-postProcessing directory calculated.
+    """
+    import os
+    from pyALMTree.phase_average.organise_case.manifest import read_manifest
 
-    for folder in os.listdir(postProcessing_path):
+    manifest = read_manifest(postProcessing_path)
+    if manifest is not None:
+        turbines = [turbine["turbine"] for turbine in manifest["turbines"]]
+        folders = [turbine["folder"] for turbine in manifest["turbines"]]
+        function_objects = {
+            function_object: (
+                {
+                    turbine: os.path.join(case_path, folder, function_object)
+                    for turbine, folder in zip(turbines, folders)
+                },
+                {
+                    file: [
+                        (time_dir, os.path.join(case_path, source), dict(zip(turbines, bin_names)))
+                        for time_dir, source, bin_names in sources
+                    ]
+                    for file, sources in files.items()
+                },
+            )
+            for function_object, files in manifest["function_objects"].items()
+        }
+    else:
+        folders = [os.path.basename(postProcessing_path)]
+        function_objects = {
+            folder: (
+                {None: os.path.join(postProcessing_path, folder)},
+                _sources_from_folder(os.path.join(postProcessing_path, folder)),
+            )
+            for folder in os.listdir(postProcessing_path)
+            if os.path.isdir(os.path.join(postProcessing_path, folder))
+        }
+
+    for folder, (folder_paths, sources) in function_objects.items():
         if calculate_samples:
             if "sample" in folder:
                 print(f"  --phase averaging {folder}")
-                _calcualte_sample(os.path.join(postProcessing_path, folder))
+                _calcualte_sample(folder_paths, sources, n_workers, resume)
 
         if calculate_surfaces:
             if "surface" in folder:
                 print(f"  --phase averaging {folder}")
-                _calculate_surface(os.path.join(postProcessing_path, folder))
+                _calculate_surface(folder_paths, sources, n_workers, resume)
 
+    return folders
 
-def _calcualte_sample(sample_folder_path: str):
-    import os, pandas as pd
 
-    bins = os.listdir(sample_folder_path)
-    results_path = os.path.join(sample_folder_path, "result")
-    os.makedirs(results_path, exist_ok=True)
+def _sources_from_folder(folder_path: str) -> dict:
+    """
+    Returns:
+        dict: {file: [(time dir, path, {None: bin}), ...]} of a materialised <bin>/<file>/<time> tree,
+              see _calculate_bins.
+    """
+    import os
 
-    # for each bin
-    for bin in bins:
-        bin_path = os.path.join(sample_folder_path, bin)
+    sources = {}
+    for bin in os.listdir(folder_path):
+        bin_path = os.path.join(folder_path, bin)
+        if bin == "result" or not os.path.isdir(bin_path):
+            continue
 
-        # for each sample type
         for sample_type_folder in os.listdir(bin_path):
             sample_type_folder_path = os.path.join(bin_path, sample_type_folder)
+            sources.setdefault(sample_type_folder, []).extend(
+                (time_file, os.path.join(sample_type_folder_path, time_file), {None: bin})
+                for time_file in os.listdir(sample_type_folder_path)
+            )
+    return sources
 
-            destination_folder_path = os.path.join(results_path, sample_type_folder)
-            if not os.path.exists(destination_folder_path):
-                os.mkdir(destination_folder_path)
 
-            # for each time
-            dfs = []
-            for time_file in os.listdir(sample_type_folder_path):
-                file_path = os.path.join(sample_type_folder_path, time_file)
-                dfs.append(pd.read_csv(file_path))
+def _calcualte_sample(
+    folder_paths: dict, sources: dict, n_workers: int = 1, resume: bool = True
+):
+    """
+    Phase average the samples of every bin. result/<sample type>/ receives <bin>.csv (mean),
+    <bin>_std.csv (sample standard deviation), count.csv (number of samples in each bin) and
+    checkpoint.npz (accumulator state), see _calculate_bins.
+    """
+    _calculate_bins(
+        folder_paths,
+        sources,
+        lambda sample_type_folder: _read_sample_values,
+        _write_bin_result,
+        n_workers,
+        resume,
+    )
 
-            mean_df = sum(dfs) / len(dfs)
+
+def _calculate_bins(
+    folder_paths: dict,
+    sources: dict,
+    reader_for,
+    write,
+    n_workers: int = 1,
+    resume: bool = True,
+):
+    """
+    Phase average the files of every bin of a function object for every turbine. Each snapshot is read
+    once and folded into the WelfordAccumulator of its bin of every turbine, then each turbine's bins
+    are written to <function object>/result/<file>/ along with count.csv (number of samples in each
+    bin) and checkpoint.npz (accumulator state).
+
+    sources is {file: [(time dir, path, {turbine: bin}), ...]} in time order. With resume, a bin whose
+    checkpointed time directories are all still in its sources starts from the checkpoint and a
+    snapshot is only read if a bin of some turbine does not hold it yet; any other bin is averaged
+    from scratch.
+
+    The snapshots of each file are split into slabs of SLAB_SIZE consecutive snapshots, each read once
+    and folded by a worker into partial accumulators of its (turbine, bin) pairs. The partials are
+    merged in slab order, so the results do not depend on n_workers.
+
+    Args:
+        folder_paths (dict): {turbine: path to the function object in its phaseAveraged directory}.
+        reader_for (callable): reader_for(file) gives the picklable read(path) -> (columns, values) of
+                               the file.
+        write (callable): write(result/<file> path, bin, columns, accumulator) writes a bin.
+    """
+    import os
+    from pyALMTree.phase_average.calculate.checkpoint import save_checkpoint, load_checkpoint
+
+    for folder_path in folder_paths.values():
+        os.makedirs(os.path.join(folder_path, "result"), exist_ok=True)
+
+    bin_times = {}
+    file_results = {}
+    tasks = []
+    for sample_type_folder, file_sources in sources.items():
+        # time directories of every bin of each turbine
+        times = bin_times[sample_type_folder] = {turbine: {} for turbine in folder_paths}
+        for time_dir, _, bins in file_sources:
+            for turbine, bin in bins.items():
+                times[turbine].setdefault(bin, []).append(time_dir)
+
+        columns, accumulators, consumed = None, {}, {}
+        for turbine, folder_path in folder_paths.items():
+            checkpoint = None
+            if resume:
+                checkpoint = load_checkpoint(os.path.join(folder_path, "result", sample_type_folder))
+
+            accumulators[turbine], consumed[turbine] = {}, {}
+            for bin, bin_time_dirs in times[turbine].items():
+                accumulators[turbine][bin], consumed[turbine][bin] = None, set()
+                if checkpoint is not None and bin in checkpoint[1]:
+                    checkpoint_accumulator, checkpoint_times = checkpoint[1][bin]
+                    if set(checkpoint_times) <= set(bin_time_dirs):
+                        columns = checkpoint[0]
+                        accumulators[turbine][bin] = checkpoint_accumulator
+                        consumed[turbine][bin] = set(checkpoint_times)
+
+        # every snapshot with the bins it still has to be folded into
+        snapshots = []
+        for time_dir, path, bins in file_sources:
+            targets = [
+                (turbine, bin)
+                for turbine, bin in bins.items()
+                if time_dir not in consumed[turbine][bin]
+            ]
+            if len(targets) > 0:
+                snapshots.append((path, targets))
+
+        file_results[sample_type_folder] = (columns, accumulators)
+        read = reader_for(sample_type_folder)
+        for start in range(0, len(snapshots), SLAB_SIZE):
+            tasks.append((sample_type_folder, (snapshots[start : start + SLAB_SIZE], read)))
+
+    # merge the partial accumulators of every slab in time order
+    slab_results = _parallel_map(_accumulate_slab, [task[1] for task in tasks], n_workers)
+    for (sample_type_folder, _), (slab_columns, partials) in zip(tasks, slab_results):
+        columns, accumulators = file_results[sample_type_folder]
+        if columns is None:
+            file_results[sample_type_folder] = (slab_columns, accumulators)
+        for turbine, bins in partials.items():
+            for bin, partial in bins.items():
+                if accumulators[turbine][bin] is None:
+                    accumulators[turbine][bin] = partial
+                else:
+                    accumulators[turbine][bin].merge(partial)
+
+    for sample_type_folder, (columns, accumulators) in file_results.items():
+        for turbine, folder_path in folder_paths.items():
+            written = {
+                bin: accumulator
+                for bin, accumulator in accumulators[turbine].items()
+                if accumulator is not None
+            }
+            if len(written) == 0:
+                continue
+
+            destination_folder_path = os.path.join(folder_path, "result", sample_type_folder)
+            os.makedirs(destination_folder_path, exist_ok=True)
 
             # now save
-            mean_df.to_csv(
-                os.path.join(os.path.join(destination_folder_path, bin + ".csv")),
-                index=False,
+            for bin, accumulator in written.items():
+                write(destination_folder_path, bin, columns, accumulator)
+            _write_counts(
+                destination_folder_path,
+                {bin: accumulator.count for bin, accumulator in written.items()},
+            )
+            save_checkpoint(
+                destination_folder_path,
+                columns,
+                written,
+                {bin: bin_times[sample_type_folder][turbine][bin] for bin in written},
             )
 
-def _calculate_surface(surface_folder_path: str):
-    raise NotImplementedError("Not implemented yet")
\ No newline at end of file
+
+def _accumulate_slab(snapshots: list, read=None):
+    """
+    Read each snapshot of a slab once and fold it into a new accumulator of every (turbine, bin) it
+    belongs to.
+
+    Args:
+        snapshots (list): [(path, [(turbine, bin), ...]), ...] in time order.
+        read (callable, optional): read(path) -> (columns, values). Defaults to None (sample csv files).
+
+    Returns:
+        tuple: (columns, {turbine: {bin: WelfordAccumulator}}) of the bins in the slab.
+    """
+    from pyALMTree.phase_average.calculate.accumulator import WelfordAccumulator
+
+    if read is None:
+        read = _read_sample_values
+
+    columns, accumulators = None, {}
+    for file_path, targets in snapshots:
+        file_columns, values = read(file_path)
+        if columns is None:
+            columns = file_columns
+        for turbine, bin in targets:
+            accumulator = accumulators.setdefault(turbine, {}).get(bin)
+            if accumulator is None:
+                accumulator = accumulators[turbine][bin] = WelfordAccumulator(values.shape)
+            accumulator.update(values)
+    return columns, accumulators
+
+
+def _read_sample_values(file_path: str):
+    import pandas as pd
+
+    df = pd.read_csv(file_path)
+    return df.columns, df.to_numpy(dtype=float)
+
+
+def _read_surface_values(layout, file_path: str):
+    """
+    Args:
+        layout (SurfaceData): surface_layout of the geometry of the surface.
+
+    Returns:
+        tuple: (field name of each component, (n_values, n_components) values of every field)
+    """
+    import numpy as np
+    from pyALMTree.read.postProcessing_surface import postProcessing_surface_file
+
+    surface = postProcessing_surface_file(file_path, layout)
+    columns = [
+        name for name in surface.field_names for _ in range(surface.fields[name].shape[1])
+    ]
+    return columns, np.hstack([surface.fields[name] for name in surface.field_names])
+
+
+def _parallel_map(function, items: list, n_workers: int = 1):
+    """
+    Call function with each tuple of arguments in items, in a process pool unless n_workers is 1.
+
+    Returns:
+        iterator: The results in the order of items, each given as soon as it and the ones before it
+                  are done so the caller can fold them in without holding every result.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    if n_workers == 1 or len(items) <= 1:
+        for item in items:
+            yield function(*item)
+        return
+
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        yield from executor.map(function, *zip(*items))
+
+
+def _write_bin_result(destination_folder_path: str, bin: str, columns, accumulator):
+    import os, pandas as pd
+
+    pd.DataFrame(accumulator.mean, columns=columns).to_csv(
+        os.path.join(destination_folder_path, bin + ".csv"),
+        index=False,
+    )
+    pd.DataFrame(accumulator.std(), columns=columns).to_csv(
+        os.path.join(destination_folder_path, bin + "_std.csv"),
+        index=False,
+    )
+
+
+def _write_counts(destination_folder_path: str, bin_counts: dict):
+    import os, pandas as pd
+
+    pd.DataFrame({"bin": list(bin_counts.keys()), "count": list(bin_counts.values())}).to_csv(
+        os.path.join(destination_folder_path, "count.csv"),
+        index=False,
+    )
+
+
+def _calculate_surface(
+    folder_paths: dict, sources: dict, n_workers: int = 1, resume: bool = True
+):
+    """
+    Phase average the surfaces of every bin, one snapshot at a time. The geometry of each surface is
+    read once and reused for every snapshot and result. result/<surface file>/ receives <bin>.<ext>
+    (mean) and <bin>_std.<ext> (sample standard deviation) in the format of the surface, along with
+    count.csv and checkpoint.npz, see _calculate_bins.
+    """
+    import os
+    from functools import partial
+    from pyALMTree.read.postProcessing_surface import (
+        postProcessing_surface_file,
+        write_surface_file,
+        surface_layout,
+    )
+
+    # the geometry of every surface, from its first snapshot, stays here for writing the results and
+    # only its layout goes with the tasks
+    geometries = {}
+    layouts = {}
+    for surface_file, file_sources in sources.items():
+        if len(file_sources) > 0:
+            geometries[surface_file] = postProcessing_surface_file(file_sources[0][1])
+            layouts[surface_file] = surface_layout(geometries[surface_file])
+
+    def write(destination_folder_path, bin, columns, accumulator):
+        surface_file = os.path.basename(destination_folder_path)
+        geometry = geometries[surface_file]
+        extension = os.path.splitext(surface_file)[1]
+        for suffix, values in [("", accumulator.mean), ("_std", accumulator.std())]:
+            write_surface_file(
+                os.path.join(destination_folder_path, bin + suffix + extension),
+                geometry,
+                _fields_from_columns(columns, values),
+            )
+
+    _calculate_bins(
+        folder_paths,
+        sources,
+        lambda surface_file: partial(_read_surface_values, layouts[surface_file]),
+        write,
+        n_workers,
+        resume,
+    )
+
+
+def _fields_from_columns(columns: list, values) -> dict:
+    """
+    Returns:
+        dict: {field: (n_values, n_components)} from the columns of _read_surface_values.
+    """
+    fields = {}
+    for name in dict.fromkeys(columns):
+        fields[name] = values[:, [i for i, column in enumerate(columns) if column == name]]
+    return fields
@@ -1,50 +1,286 @@
+import numpy as np
+
+# blade distribution files phase averaged into (bin, blade, element) arrays
+BLADE_LOAD_FILES = ["tangentialForce", "normalForce", "axialForce"]
+
+# suffix of the blade bin files written by organise_case.turbineOutput
+BLADE_BINS_SUFFIX = "_bins.npz"
+
+
+class BladeLoadResult:
+    def __init__(self):
+        self.key = None
+        self.bin_names = np.array([], dtype=str)
+        self.blades = np.array([], dtype=int)
+        self.mean = np.empty((0, 0, 0))
+        self.std = np.empty((0, 0, 0))
+        self.count = np.empty((0, 0), dtype=np.int64)
+
+
 def turbineOutput(
     case_path: str,
     calculate_rotor_performance: bool = True,
     calculate_blade_loads: bool = True,
 ):
+    """take the organised phaseAveraged-turbineOutput directory and calculate the phase averaged rotor
+    performance and blade loads, which are stored in its result directory. In a multi turbine case
+    each phaseAveraged-turbineOutput-turbine<i> directory is calculated.
+
+    Args:
+        case_path (str): Path to case.
+        calculate_rotor_performance (bool, optional): Phase average thrust, powerRotor and torqueRotor. Defaults to True.
+        calculate_blade_loads (bool, optional): Phase average the organised blade loads into
+                                                result/<file>.npz (see read_blade_load_result). Defaults to True.
+    """
+    import os
+    from pyALMTree.phase_average.organise_case.rotation_angle import phaseAveraged_dir_names
+
+    # one directory per turbine in a multi turbine case
+    for folder in phaseAveraged_dir_names(case_path, "turbineOutput"):
+        turbineOutput_path = os.path.join(case_path, folder)
+        results_path = os.path.join(turbineOutput_path, "result")
+        if not os.path.exists(results_path):
+            os.mkdir(results_path)
+
+        for file in os.listdir(turbineOutput_path):
+            if calculate_blade_loads:
+                if file.endswith(BLADE_BINS_SUFFIX):
+                    print(f"  --phase averaging {file[: -len(BLADE_BINS_SUFFIX)]}")
+                    bins_path = os.path.join(turbineOutput_path, file)
+                    _calculate_blade_loads(case_path, bins_path, results_path)
+
+            if calculate_rotor_performance:
+                if file in ["thrust", "powerRotor", "torqueRotor"]:
+                    print(f"  --phase averaging {file}")
+                    file_path = os.path.join(turbineOutput_path, file)
+                    _calculate_performance(file_path, results_path)
+
+
+def blade_loads(
+    case_path: str,
+    bin_size: float,
+    file_name: str,
+    time_start: float = 0,
+    turbineOutput_subdir: str = None,
+    blade_offsets=None,
+    time_rtol: float = 1e-5,
+    interpolate_angle: bool = False,
+    turbine: int = None,
+) -> BladeLoadResult:
+    """
+    Phase average a blade distribution file (e.g. axialForce) straight from the case, binning each
+    blade by its own azimuth.
+
+    Args:
+        case_path (str): path to case
+        bin_size (float): bin size in degrees
+        file_name (str): Name of the blade distribution file in the turbineOutput subdir.
+        time_start (float, optional): time to start processsing after. Defaults to 0.
+        turbineOutput_subdir (str, optional): Name of turbineOutput subdir. Defaults to None in which case if only one subdir exists it will assume that.
+        blade_offsets (array like, optional): Azimuthal offset of each blade in degrees, measured in the
+                                              direction of rotation. Defaults to None (evenly spaced).
+        time_rtol (float, optional): Relative tolerance when matching the times to the rotationAngle
+                                     times. Defaults to 1e-5.
+        interpolate_angle (bool, optional): Interpolate the rotor angle at each time rather than taking
+                                            the angle of the matching row. Defaults to False.
+        turbine (int, optional): Turbine to phase average. Defaults to None in which case the case must
+                                 have a single turbine.
+
+    Returns:
+        BladeLoadResult: mean and std with shape (n_bins, n_blades, n_elements) and count with shape
+                         (n_bins, n_blades).
+    """
     import os
-    
-    turbineOutput_path = os.path.join(case_path, "phaseAveraged-turbineOutput")
-    results_path = os.path.join(turbineOutput_path, "result")
-    if not os.path.exists(results_path):
-        os.mkdir(results_path)
-    
-    for file in os.listdir(turbineOutput_path):
-        if calculate_blade_loads:
-            print(f"  --phase averaging {file}")
-            raise NotImplementedError("Not implemented yet!")
-            
-        if calculate_rotor_performance:
-            if file in ["thrust", "powerRotor", "torqueRotor"]:
-                print(f"  --phase averaging {file}")
-                file_path = os.path.join(turbineOutput_path, file)
-                _calculate_performance(file_path, results_path)
-                
-                
-                
-                
+    from pyALMTree.phase_average.organise_case.rotation_angle import read_rotation_angle
+
+    rotation = read_rotation_angle(case_path, bin_size, turbineOutput_subdir, turbine=turbine)
+    return _blade_loads_from_rotation(
+        os.path.join(rotation.turbineOutput_subdir_path, file_name),
+        rotation,
+        time_start,
+        blade_offsets,
+        time_rtol,
+        interpolate_angle,
+    )
+
+
+def read_blade_load_result(file_path: str) -> BladeLoadResult:
+    """
+    Args:
+        file_path (str): Path to a result/<file>.npz written by the blade load phase averaging.
+
+    Returns:
+        BladeLoadResult: The phase averaged blade loads.
+    """
+    result = BladeLoadResult()
+    with np.load(file_path, allow_pickle=False) as data:
+        result.key = str(data["key"])
+        result.bin_names = data["bin_names"]
+        result.blades = data["blades"]
+        result.mean = data["mean"]
+        result.std = data["std"]
+        result.count = data["count"]
+    return result
+
+
 def _calculate_performance(file_path, results_path):
-    import os, pandas as pd, numpy as np
-    
+    import os, pandas as pd
+
     df = pd.read_csv(file_path)
-    grouped = df.groupby('bin')
-    
-    bin_values = np.array([])
-    output_values = np.array([])
-    
-    for bin_value, group in grouped:
-        # assuming index 4 is alway the value of interest
-        key = group.keys()[4]
-        
-        # add values to arrays
-        bin_values = np.append(bin_values, bin_value)
-        output_values = np.append(output_values, np.mean(group[key]))
-        
+    output_df = _performance_result(df, os.path.basename(file_path))
+
+    destination = os.path.join(results_path, os.path.basename(file_path))
+    output_df.to_csv(destination, index=False)
+
+
+def _performance_result(df, name):
+    """
+    Statistics of every numeric column after dt(s) of a binned rotor performance DataFrame in each bin.
+
+    The bins are reduced to integer codes once and every statistic is a bincount or ufunc.at reduction
+    over the codes.
+
+    Returns:
+        pd.DataFrame: bin, <name> (mean of the first value column), then <column>_mean, <column>_std
+                      (sample standard deviation), <column>_min and <column>_max of every value column
+                      and count, with one row per bin in sorted order.
+    """
+    import pandas as pd, numpy as np
+
+    value_columns = df.columns[df.columns.get_loc("dt(s)") + 1 :]
+    value_columns = [
+        column
+        for column in value_columns
+        if column != "bin" and pd.api.types.is_numeric_dtype(df[column])
+    ]
+
+    # integer bin codes in sorted bin order (cheap if bin is categorical)
+    codes, bin_values = pd.factorize(df["bin"], sort=True)
+    bin_values = np.asarray(bin_values)
+    counts = np.bincount(codes, minlength=len(bin_values))
+    values = df[value_columns].to_numpy(dtype=np.float64)
+
+    shape = (len(bin_values), len(value_columns))
+    means = np.empty(shape)
+    squares = np.empty(shape)
+    mins = np.full(shape, np.inf)
+    maxs = np.full(shape, -np.inf)
+    # one pass per column: 1D bincount/ufunc.at are much faster than their 2D forms
+    for i in range(len(value_columns)):
+        column = values[:, i]
+        means[:, i] = np.bincount(codes, column, len(bin_values)) / counts
+        squares[:, i] = np.bincount(codes, (column - means[codes, i]) ** 2, len(bin_values))
+        np.minimum.at(mins[:, i], codes, column)
+        np.maximum.at(maxs[:, i], codes, column)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        stds = np.sqrt(squares / (counts[:, None] - 1))
+    stds[counts <= 1] = np.nan
+
     output_df = pd.DataFrame()
     output_df["bin"] = bin_values
-    output_df[os.path.basename(file_path)] = output_values
-    
-    destination = os.path.join(results_path, os.path.basename(file_path))
-    output_df.to_csv(destination, index=False)  
+    output_df[name] = means[:, 0]
+    for i, column in enumerate(value_columns):
+        output_df[f"{column}_mean"] = means[:, i]
+        output_df[f"{column}_std"] = stds[:, i]
+        output_df[f"{column}_min"] = mins[:, i]
+        output_df[f"{column}_max"] = maxs[:, i]
+    output_df["count"] = counts
+    return output_df
+
+
+def _calculate_blade_loads(case_path, bins_path, results_path):
+    import os
+    from pyALMTree.read.turbineOutput import turbineOutput_blade_file
+
+    with np.load(bins_path, allow_pickle=False) as bins:
+        source = str(bins["source"])
+        time = bins["time"]
+        bin_inds = bins["bin_inds"]
+        bin_names = bins["bin_names"]
+        turbine = int(bins["turbine"]) if "turbine" in bins else 0
+
+    data = turbineOutput_blade_file(os.path.join(case_path, source), turbine=turbine)
+    keep = np.isin(data.time, time)
+    if np.count_nonzero(keep) != len(time):
+        raise ValueError(f"{source} no longer has the times in {bins_path}")
+
+    result = _blade_load_result(data.key, data.blades, bin_names, data.values[keep], bin_inds)
+    _write_blade_load_result(
+        os.path.join(results_path, os.path.basename(source) + ".npz"), result
+    )
+
+
+def _blade_loads_from_rotation(
+    file_path, rotation, time_start, blade_offsets, time_rtol, interpolate_angle
+) -> BladeLoadResult:
+    from pyALMTree.read.turbineOutput import turbineOutput_blade_file
+
+    data = turbineOutput_blade_file(file_path, turbine=rotation.turbine)
+
+    keep = data.time > time_start
+    bin_inds = rotation.blade_bin_indices(
+        data.time[keep], len(data.blades), blade_offsets, time_rtol, interpolate_angle
+    )
+    return _blade_load_result(
+        data.key, data.blades, rotation.bin_names[1:], data.values[keep], bin_inds
+    )
+
+
+def _blade_load_result(key, blades, bin_names, values, bin_inds) -> BladeLoadResult:
+    """
+    Mean, std and count of a (n_times, n_blades, n_elements) blade distribution in every (bin, blade).
+
+    The (bin, blade) pairs are sorted once and each statistic is a single reduceat over the element
+    rows. Pairs without samples are NaN, and so is the std of pairs with a single sample.
+
+    Args:
+        bin_inds (np.ndarray): (n_times, n_blades) index of the bin of each blade in bin_names, or -1 to
+                               leave it out.
+    """
+    n_times, n_blades, n_elements = values.shape
+    n_groups = len(bin_names) * n_blades
+
+    # one group per (bin, blade), leaving out the blades outside the bins
+    groups = (bin_inds * n_blades + np.arange(n_blades)[None, :]).ravel()
+    rows = values.reshape(-1, n_elements)
+    inside = bin_inds.ravel() >= 0
+    groups = groups[inside]
+    rows = rows[inside]
+
+    counts = np.bincount(groups, minlength=n_groups)
+    mean = np.full((n_groups, n_elements), np.nan)
+    std = np.full((n_groups, n_elements), np.nan)
+
+    present = np.flatnonzero(counts)
+    if len(present) > 0:
+        rows = rows[np.argsort(groups, kind="stable")]
+        starts = np.concatenate(([0], np.cumsum(counts[present])[:-1]))
+
+        mean[present] = np.add.reduceat(rows, starts, axis=0) / counts[present, None]
+        deviations = rows - np.repeat(mean[present], counts[present], axis=0)
+        squares = np.add.reduceat(deviations**2, starts, axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            std[present] = np.sqrt(squares / (counts[present, None] - 1))
+        std[counts <= 1] = np.nan
+
+    result = BladeLoadResult()
+    result.key = key
+    result.bin_names = np.asarray(bin_names, dtype=str)
+    result.blades = np.asarray(blades)
+    result.mean = mean.reshape(len(bin_names), n_blades, n_elements)
+    result.std = std.reshape(len(bin_names), n_blades, n_elements)
+    result.count = counts.reshape(len(bin_names), n_blades)
+    return result
+
 
+def _write_blade_load_result(file_path, result: BladeLoadResult):
+    np.savez(
+        file_path,
+        key=np.array(result.key),
+        bin_names=result.bin_names,
+        blades=result.blades,
+        mean=result.mean,
+        std=result.std,
+        count=result.count,
+    )
@@ -0,0 +1,195 @@
+def phase_average_case(
+    case_path: str,
+    bin_size: float,
+    time_start: float = 0,
+    turbineOutput_subdir: str = None,
+    calculate_samples: bool = True,
+    calculate_surfaces: bool = True,
+    calculate_rotor_performance: bool = True,
+    calculate_blade_loads: bool = True,
+    blade_offsets=None,
+    time_rtol: float = 1e-5,
+    interpolate_angle: bool = False,
+    n_workers: int = 1,
+    resume: bool = True,
+):
+    """phase average a case in a single pass, without the organise, calculate and clean up stages.
+
+    rotationAngle is read once, every sample and surface time directory is streamed exactly once with
+    each snapshot folded into the accumulator of its bin, and only the result outputs are written, in
+    the same locations and layout as the staged pipeline (phaseAveraged-postProcessing/<function
+    object>/result and phaseAveraged-turbineOutput/result). If rotationAngle has several turbines
+    every snapshot is folded into its bin of each turbine, binned by the turbine's own rotor angle, and
+    written to its own phaseAveraged-<name>-turbine<i> directories.
+
+    Args:
+        case_path (str): path to case
+        bin_size (float): bin size in degrees
+        time_start (float, optional): time to start processsing after. Defaults to 0.
+        turbineOutput_subdir (str, optional): Name of turbineOutput subdir. Defaults to None in which case if only one subdir exists it will assume that.
+        calculate_samples (bool, optional): Phase average the sample function objects. Defaults to True.
+        calculate_surfaces (bool, optional): Phase average the surface function objects (raw or legacy
+                                             ASCII VTK). Defaults to True.
+        calculate_rotor_performance (bool, optional): Phase average the rotor performance. Defaults to True.
+        calculate_blade_loads (bool, optional): Phase average the blade loads into
+                                                phaseAveraged-turbineOutput/result/<file>.npz. Defaults to True.
+        blade_offsets (array like, optional): Azimuthal offset of each blade in degrees, measured in the
+                                              direction of rotation. Defaults to None (evenly spaced).
+        time_rtol (float, optional): Relative tolerance when matching time directory names to the
+                                     rotationAngle times. Defaults to 1e-5.
+        interpolate_angle (bool, optional): Interpolate the rotor angle at each time directory rather
+                                            than taking the angle of the matching row. Defaults to False.
+        n_workers (int, optional): Number of processes averaging time slabs of the files at once.
+                                   None uses one per CPU. Defaults to 1 (serial).
+        resume (bool, optional): Continue from the accumulator checkpoints of a previous run, reading
+                                 only the new time directories. Defaults to True.
+    """
+    import os
+    from pyALMTree.read.catalog import CaseCatalog
+    from pyALMTree.read.turbineOutput import turbineOutput_file
+    from pyALMTree.phase_average.organise_case.rotation_angle import (
+        read_rotation_angles,
+        phaseAveraged_dir_name,
+        turbine_rows,
+    )
+    from pyALMTree.phase_average.calculate.turbineOutput import (
+        BLADE_LOAD_FILES,
+        _blade_loads_from_rotation,
+        _write_blade_load_result,
+    )
+
+    catalog = CaseCatalog(case_path)
+    rotations = read_rotation_angles(case_path, bin_size, turbineOutput_subdir, catalog)
+    turbineOutput_subdir_path = next(iter(rotations.values())).turbineOutput_subdir_path
+
+    phaseAveraged_postProcessing_paths = {
+        turbine: os.path.join(case_path, phaseAveraged_dir_name("postProcessing", turbine, rotations))
+        for turbine in rotations
+    }
+    for dir in catalog.function_objects():
+        if (calculate_samples and "sample" in dir) or (calculate_surfaces and "surface" in dir):
+            print(f"  --phase averaging {dir}")
+            _phase_average_function_object(
+                case_path,
+                catalog,
+                dir,
+                rotations,
+                phaseAveraged_postProcessing_paths,
+                time_start,
+                time_rtol,
+                interpolate_angle,
+                n_workers,
+                resume,
+            )
+
+    results_paths = {
+        turbine: os.path.join(
+            case_path, phaseAveraged_dir_name("turbineOutput", turbine, rotations), "result"
+        )
+        for turbine in rotations
+    }
+    if calculate_rotor_performance or calculate_blade_loads:
+        for results_path in results_paths.values():
+            os.makedirs(results_path, exist_ok=True)
+
+    for file in catalog.files("turbineOutput", os.path.basename(turbineOutput_subdir_path)):
+        if calculate_blade_loads:
+            if file in BLADE_LOAD_FILES:
+                print(f"  --phase averaging {file}")
+                for turbine, rotation in rotations.items():
+                    result = _blade_loads_from_rotation(
+                        os.path.join(turbineOutput_subdir_path, file),
+                        rotation,
+                        time_start,
+                        blade_offsets,
+                        time_rtol,
+                        interpolate_angle,
+                    )
+                    _write_blade_load_result(
+                        os.path.join(results_paths[turbine], file + ".npz"), result
+                    )
+
+        if calculate_rotor_performance:
+            if file in ["thrust", "powerRotor", "torqueRotor"]:
+                print(f"  --phase averaging {file}")
+                # read once and split by turbine, the rows of each turbine line up with rotationAngle
+                df = turbineOutput_file(os.path.join(turbineOutput_subdir_path, file))
+                for turbine, rows in turbine_rows(df["#Turbine"]).items():
+                    if turbine in rotations:
+                        _phase_average_performance(
+                            df.iloc[rows].reset_index(drop=True),
+                            file,
+                            results_paths[turbine],
+                            rotations[turbine],
+                            time_start,
+                        )
+
+
+def _phase_average_function_object(
+    case_path,
+    catalog,
+    function_object,
+    rotations,
+    phaseAveraged_paths,
+    time_start,
+    time_rtol,
+    interpolate_angle,
+    n_workers,
+    resume,
+):
+    import os
+    import numpy as np
+    from pyALMTree.phase_average.calculate.postProcessing import (
+        _calcualte_sample,
+        _calculate_surface,
+    )
+
+    time_dirs = np.array(catalog.time_dirs("postProcessing", function_object))
+    dir_times = catalog.times("postProcessing", function_object)
+    keep = dir_times >= time_start
+    time_dirs = time_dirs[keep]
+    dir_bin_names = {
+        turbine: rotation.bin_names_at(dir_times[keep], time_rtol, interpolate_angle)
+        for turbine, rotation in rotations.items()
+    }
+
+    # {file: [(time dir, path, {turbine: bin}), ...]} in time order, straight from the case
+    sources = {}
+    for i, time_dir in enumerate(time_dirs):
+        time_dir = str(time_dir)
+        bins = {turbine: str(bin_names[i]) for turbine, bin_names in dir_bin_names.items()}
+        for file in catalog.files("postProcessing", function_object, time_dir):
+            sources.setdefault(file, []).append(
+                (
+                    time_dir,
+                    os.path.join(case_path, "postProcessing", function_object, time_dir, file),
+                    bins,
+                )
+            )
+
+    calculate = _calculate_surface if "surface" in function_object else _calcualte_sample
+    calculate(
+        {
+            turbine: os.path.join(phaseAveraged_path, function_object)
+            for turbine, phaseAveraged_path in phaseAveraged_paths.items()
+        },
+        sources,
+        n_workers,
+        resume,
+    )
+
+
+def _phase_average_performance(df, name, results_path, rotation, time_start):
+    import os
+    import numpy as np
+    import pandas as pd
+    from pyALMTree.phase_average.calculate.turbineOutput import _performance_result
+
+    # categorical bins in sorted order, so the bin codes do not have to be found from the strings
+    df["bin"] = pd.Categorical.from_codes(
+        rotation.bin_inds, rotation.bin_names
+    ).reorder_categories(np.sort(rotation.bin_names))
+    df = df[df["Time(s)"] > time_start]
+
+    output_df = _performance_result(df, name)
+    output_df.to_csv(os.path.join(results_path, name), index=False)
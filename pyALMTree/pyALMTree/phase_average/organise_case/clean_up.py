@@ -16,6 +16,9 @@ def clean_up(case_path: str):
                         os.remove(subfolder_path)
                         continue
                 
+                if "result" in subfolder:
+                    continue
+
                 print(f"  --cleaning {subfolder}")
                 for subsubfolder in os.listdir(subfolder_path):
                     
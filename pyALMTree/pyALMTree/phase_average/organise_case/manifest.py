@@ -0,0 +1,142 @@
+import os
+import json
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+# name of the bin manifest written in phaseAveraged-postProcessing
+MANIFEST_FILE_NAME = "manifest.json"
+
+# bump this whenever the layout of the manifest changes
+MANIFEST_VERSION = 2
+
+MATERIALISE_OPTIONS = ["symlink", "hardlink", "copy"]
+
+
+def write_manifest(phaseAveraged_path: str, turbines: list, function_objects: dict):
+    """
+    Write the bin manifest of a phase averaged directory.
+
+    A multi turbine case writes the same manifest in the directory of every turbine, so each time
+    directory is listed once with its bin of every turbine.
+
+    Args:
+        phaseAveraged_path (str): Path to the phaseAveraged-postProcessing directory.
+        turbines (list): [{"turbine": turbine, "folder": phaseAveraged-postProcessing directory name,
+                         "bins": name of every bin (including "outside")}, ...] in turbine order.
+        function_objects (dict): {function object: {file: [[time dir, source path, [bin of each
+                                 turbine]], ...]}} in time order, where the source paths are relative
+                                 to the case.
+    """
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "turbines": [
+            {
+                "turbine": int(turbine["turbine"]),
+                "folder": turbine["folder"],
+                "bins": [str(name) for name in turbine["bins"]],
+            }
+            for turbine in turbines
+        ],
+        "function_objects": function_objects,
+    }
+    # write to a temporary file and move it into place so a reader never sees half a manifest
+    fd, tmp_path = tempfile.mkstemp(dir=phaseAveraged_path, suffix=".json.tmp")
+    with os.fdopen(fd, "w") as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, os.path.join(phaseAveraged_path, MANIFEST_FILE_NAME))
+
+
+def read_manifest(phaseAveraged_path: str):
+    """
+    Read the bin manifest of a phase averaged directory.
+
+    Args:
+        phaseAveraged_path (str): Path to the phaseAveraged-postProcessing directory.
+
+    Raises:
+        ValueError: If the manifest was written by an incompatible version.
+
+    Returns:
+        dict: The manifest (see write_manifest) or None if the directory has no manifest.
+    """
+    manifest_path = os.path.join(phaseAveraged_path, MANIFEST_FILE_NAME)
+    if not os.path.exists(manifest_path):
+        return None
+
+    with open(manifest_path, "r") as f:
+        manifest = json.load(f)
+    if manifest.get("version") != MANIFEST_VERSION:
+        raise ValueError(f"Unsupported manifest version in {manifest_path}")
+    return manifest
+
+
+def turbine_bins(files: dict, index: int) -> dict:
+    """
+    Args:
+        files (dict): {file: [[time dir, source path, [bin of each turbine]], ...]} of a function
+                      object of the manifest.
+        index (int): Position of the turbine in the turbines of the manifest.
+
+    Returns:
+        dict: {bin: {file: [[time dir, source path], ...]}} of the turbine, in time order.
+    """
+    bins = {}
+    for file, sources in files.items():
+        for time_dir, source, bin_names in sources:
+            bins.setdefault(bin_names[index], {}).setdefault(file, []).append([time_dir, source])
+    return bins
+
+
+def materialise(
+    case_path: str,
+    phaseAveraged_path: str,
+    function_object: str,
+    bins: dict,
+    mode: str,
+    n_workers: int = 1,
+):
+    """
+    Create the <function object>/<bin>/<file>/<time> tree of a manifest entry as links or copies of
+    the source files.
+
+    Args:
+        case_path (str): Path to case.
+        phaseAveraged_path (str): Path to the phaseAveraged-postProcessing directory.
+        function_object (str): Name of the function object.
+        bins (dict): {bin: {file: [[time dir, source path], ...]}} of a turbine, see turbine_bins.
+        mode (str): One of "symlink", "hardlink" or "copy".
+        n_workers (int, optional): Number of (bin, file) directories to fill at once. None uses the
+                                   executor default. Defaults to 1.
+
+    Raises:
+        ValueError: If mode is not one of MATERIALISE_OPTIONS.
+    """
+    if mode not in MATERIALISE_OPTIONS:
+        raise ValueError(f"materialise must be one of {MATERIALISE_OPTIONS}, not {mode}")
+
+    def fill(bin_name, file, sources):
+        destination_folder_path = os.path.join(phaseAveraged_path, function_object, bin_name, file)
+        os.makedirs(destination_folder_path, exist_ok=True)
+
+        for time_dir, source in sources:
+            location = os.path.abspath(os.path.join(case_path, source))
+            destination = os.path.join(destination_folder_path, time_dir)
+            if os.path.lexists(destination):
+                os.remove(destination)
+
+            if mode == "symlink":
+                os.symlink(location, destination)
+            elif mode == "hardlink":
+                os.link(location, destination)
+            else:
+                shutil.copy(location, destination)
+
+    jobs = [
+        (bin_name, file, sources)
+        for bin_name, files in bins.items()
+        for file, sources in files.items()
+    ]
+    with ThreadPoolExecutor(max_workers=n_workers) as executor:
+        # list() so that any exception raised by a worker is propagated
+        list(executor.map(lambda job: fill(*job), jobs))
@@ -5,9 +5,22 @@ def postProcessing(
     turbineOutput_subdir: str = None,
     organise_samples: bool = True,
     organise_surfaces: bool = True,
+    materialise: str = None,
+    time_rtol: float = 1e-5,
+    interpolate_angle: bool = False,
+    n_workers: int = 1,
 ):
     """organise the post processing path into phase averaged bins using the rotorAngle file.
 
+    Rather than copying every file into its bin, the bins are recorded in a single manifest
+    (phaseAveraged-postProcessing/manifest.json) giving the bin of every time directory and its source
+    files, which calculate.postProcessing then reads directly.
+
+    If rotationAngle has several turbines the time directories are binned by the rotor angle of each
+    turbine in the same pass, with one phaseAveraged-postProcessing-turbine<i> directory per turbine.
+    Each of them holds the same manifest, giving the bin of every turbine for each time directory so
+    calculate.postProcessing reads every file once for all turbines.
+
     Args:
         case_path (str): path to case
         bin_size (float): bin size in degrees
@@ -15,196 +28,112 @@ def postProcessing(
         turbineOutput_subdir (str, optional): Name of turbineOutput subdir. Defaults to None in which case if only one subdir exists it will assume that.
         organise_samples (bool, optional): Organise the sample files. Defaults to True.
         organise_surfaces (bool, optional): Organise the surface files. Defaults to True.
+        materialise (str, optional): Also create the <function object>/<bin>/<file>/<time> tree using
+                                     "symlink", "hardlink" or "copy". Defaults to None (manifest only).
+        time_rtol (float, optional): Relative tolerance when matching time directory names to the
+                                     rotationAngle times. Defaults to 1e-5.
+        interpolate_angle (bool, optional): Interpolate the rotor angle at each time directory rather
+                                            than taking the angle of the matching row. Defaults to False.
+        n_workers (int, optional): Number of threads materialising the bins. None uses the executor
+                                   default. Defaults to 1.
     """
     import os
-    import pandas as pd
-    import numpy as np
+    from pyALMTree.read.catalog import CaseCatalog
+    from pyALMTree.phase_average.organise_case.rotation_angle import (
+        read_rotation_angles,
+        phaseAveraged_dir_name,
+    )
+    from pyALMTree.phase_average.organise_case.manifest import (
+        write_manifest,
+        turbine_bins,
+        materialise as materialise_bins,
+    )
 
-    postProcess_path = os.path.join(case_path, "postProcessing")
-    if not os.path.exists(postProcess_path):
-        raise FileExistsError("Cannot Find postProcessing")
+    catalog = CaseCatalog(case_path)
 
-    turbineOutput_path = os.path.join(case_path, "turbineOutput")
-    if not os.path.exists(turbineOutput_path):
-        raise FileExistsError("Cannot Find turbineOutput")
+    if not catalog.exists("postProcessing"):
+        raise FileExistsError("Cannot Find postProcessing")
 
-    subdirs = os.listdir(turbineOutput_path)
-    if len(subdirs) > 1:
-        if turbineOutput_subdir == None:
-            raise ValueError("No turbineOutput subdirectory provided")
+    rotations = read_rotation_angles(case_path, bin_size, turbineOutput_subdir, catalog)
 
-        turbineOutput_subdir_path = os.path.join(
-            turbineOutput_path, turbineOutput_subdir
+    # create new dirs to place phase avereaged values in
+    phaseAveraged_postProcessing_paths = {}
+    for turbine in rotations:
+        phaseAveraged_postProcessing_paths[turbine] = os.path.join(
+            case_path, phaseAveraged_dir_name("postProcessing", turbine, rotations)
         )
-        if not os.path.exists(turbineOutput_subdir_path):
-            raise FileExistsError(
-                "turbineOutput path subdirectory provided does not exist"
+        os.makedirs(phaseAveraged_postProcessing_paths[turbine], exist_ok=True)
+
+    function_objects = {}
+    for dir in catalog.function_objects():
+        if (organise_surfaces and "surface" in dir) or (organise_samples and "sample" in dir):
+            print(f"  --organising {dir}")
+            function_objects[dir] = _organise_function_object(
+                catalog,
+                dir,
+                rotations,
+                time_start,
+                time_rtol,
+                interpolate_angle,
             )
-    else:
-        turbineOutput_subdir_path = os.path.join(turbineOutput_path, subdirs[0])
 
-    rotationAngle_path = os.path.join(turbineOutput_subdir_path, "rotationAngle")
-    if not os.path.exists(rotationAngle_path):
-        FileExistsError("turbineOutput/subdir/rotationAngle does not exist")
-
-    df_rotation_angle = pd.read_csv(rotationAngle_path, sep=r"\s+")
-
-    # for now assume a single turbine
-    if np.unique(df_rotation_angle["#Turbine"]) != [0]:
-        raise NotImplementedError("More than one turbine - not implemented")
-
-    # determine the rotation direction
-    if np.max(df_rotation_angle["rotAngle(deg)"]) > 0:
-        bins = np.arange(0, 360 + bin_size / 2, bin_size)
-    else:
-        bins = np.arange(-360, bin_size / 2, bin_size)
-
-    times = df_rotation_angle["Time(s)"]
-    times_float = np.array(times, dtype=float)
-    bin_inds = np.digitize(df_rotation_angle["rotAngle(deg)"], bins)
-
-    # create new dir to place phase avereaged values in
-    os.makedirs(os.path.join(case_path, "phaseAveraged-postProcessing"), exist_ok=True)
-    phaseAveraged_postProcessing_path = os.path.join(
-        case_path, "phaseAveraged-postProcessing"
-    )
-
-    for dir in os.listdir(postProcess_path):
-        if organise_surfaces:
-            if "surface" in dir:
-                surface_dir_path = os.path.join(postProcess_path, dir)
-                print(f"  --organising {dir}")
-                _organise_surfaces(
-                    phaseAveraged_postProcessing_path,
-                    surface_dir_path,
-                    bins,
-                    bin_inds,
-                    times_float,
-                    time_start
-                )
-        if organise_samples:
-            if "sample" in dir:
-                sample_dir_path = os.path.join(postProcess_path, dir)
-                print(f"  --organising {dir}")
-                _organise_samples(
-                    phaseAveraged_postProcessing_path,
-                    sample_dir_path,
-                    bins,
-                    bin_inds,
-                    times_float,
-                    time_start,
-                )
-
-
-def _organise_samples(
-    phaseAveraged_postProcessing_path,
-    sample_dir_path,
-    bins,
-    bin_inds,
-    times_float,
+            if materialise is not None:
+                for index, turbine in enumerate(rotations):
+                    materialise_bins(
+                        case_path,
+                        phaseAveraged_postProcessing_paths[turbine],
+                        dir,
+                        turbine_bins(function_objects[dir], index),
+                        materialise,
+                        n_workers,
+                    )
+
+    turbines = [
+        {
+            "turbine": turbine,
+            "folder": os.path.basename(phaseAveraged_postProcessing_paths[turbine]),
+            "bins": rotation.bin_names,
+        }
+        for turbine, rotation in rotations.items()
+    ]
+    for turbine in rotations:
+        write_manifest(phaseAveraged_postProcessing_paths[turbine], turbines, function_objects)
+
+
+def _organise_function_object(
+    catalog,
+    function_object,
+    rotations,
     time_start,
+    time_rtol,
+    interpolate_angle,
 ):
+    """
+    Returns:
+        dict: {file: [[time dir, source path relative to the case, [bin of each turbine]], ...]} in
+              time order.
+    """
     import os
     import numpy as np
-    import shutil
 
-    phaseAveraged_sample_path = os.path.join(
-        phaseAveraged_postProcessing_path, os.path.basename(sample_dir_path)
-    )
-    os.makedirs(phaseAveraged_sample_path, exist_ok=True)
-
-    bin_names = np.array("outside")
-    for i in range(1, len(bins)):
-        bin_names = np.append(bin_names, f"{bins[i-1]}_{bins[i]}")
-
-    for name in bin_names:
-        os.makedirs(os.path.join(phaseAveraged_sample_path, name), exist_ok=True)
-
-    for time_dir in os.listdir(sample_dir_path):
-        time_dir_path = os.path.join(sample_dir_path, time_dir)
-        time_dir_str = time_dir
-        time_dir_float = float(time_dir)
-        
-        if time_dir_float < time_start:
-            continue
-        
-        if time_dir_float in times_float:
-            ind = np.where(time_dir_float == times_float)[0][0]
-            bin_ind = bin_inds[ind]
-
-            # copy the files to the bin
-            bin_path = os.path.join(phaseAveraged_sample_path, bin_names[bin_ind])
-            for file in os.listdir(time_dir_path):
-                phase_averaged_file_folder_path = os.path.join(bin_path, file)
-
-                if not os.path.exists(phase_averaged_file_folder_path):
-                    os.makedirs(phase_averaged_file_folder_path)
-
-                location = os.path.join(time_dir_path, file)
-                destination = os.path.join(
-                    phase_averaged_file_folder_path, time_dir_str
-                )
-
-                shutil.copy(location, destination)
-
-        else:
-            raise LookupError(
-                f"Could not find sample time {time_dir} in rotationAngle times"
+    time_dirs = np.array(catalog.time_dirs("postProcessing", function_object))
+    dir_times = catalog.times("postProcessing", function_object)
+    keep = dir_times >= time_start
+    time_dirs = time_dirs[keep]
+
+    # map every time directory to its bin of each turbine at once
+    dir_bin_names = [
+        rotation.bin_names_at(dir_times[keep], time_rtol, interpolate_angle)
+        for rotation in rotations.values()
+    ]
+
+    files = {}
+    for i, time_dir in enumerate(time_dirs):
+        time_dir = str(time_dir)
+        bin_names = [str(bin_names[i]) for bin_names in dir_bin_names]
+        for file in catalog.files("postProcessing", function_object, time_dir):
+            files.setdefault(file, []).append(
+                [time_dir, os.path.join("postProcessing", function_object, time_dir, file), bin_names]
             )
 
-
-def _organise_surfaces(
-    phaseAveraged_postProcessing_path,
-    surface_dir_path,
-    bins,
-    bin_inds,
-    times_float,
-    time_start,
-):
-    import os
-    import numpy as np
-    import shutil
-
-    phaseAveraged_surface_path = os.path.join(
-        phaseAveraged_postProcessing_path, os.path.basename(surface_dir_path)
-    )
-    os.makedirs(phaseAveraged_surface_path, exist_ok=True)
-
-    bin_names = np.array("outside")
-    for i in range(1, len(bins)):
-        bin_names = np.append(bin_names, f"{bins[i-1]}_{bins[i]}")
-
-    for name in bin_names:
-        os.makedirs(os.path.join(phaseAveraged_surface_path, name), exist_ok=True)
-
-    for time_dir in os.listdir(surface_dir_path):
-        time_dir_path = os.path.join(surface_dir_path, time_dir)
-        time_dir_str = time_dir
-        time_dir_float = float(time_dir)
-        
-        if time_dir_float < time_start:
-            continue
-        
-        if time_dir_float in times_float:
-            ind = np.where(time_dir_float == times_float)[0][0]
-            bin_ind = bin_inds[ind]
-
-            # copy the files to the bin
-            bin_path = os.path.join(phaseAveraged_surface_path, bin_names[bin_ind])
-            for file in os.listdir(time_dir_path):
-                phase_averaged_file_folder_path = os.path.join(bin_path, file)
-
-                if not os.path.exists(phase_averaged_file_folder_path):
-                    os.makedirs(phase_averaged_file_folder_path)
-
-                location = os.path.join(time_dir_path, file)
-                destination = os.path.join(
-                    phase_averaged_file_folder_path, time_dir_str
-                )
-
-                shutil.copy(location, destination)
-
-        else:
-            raise LookupError(
-                f"Could not find sample time {time_dir} in rotationAngle times"
-            )
+    return files
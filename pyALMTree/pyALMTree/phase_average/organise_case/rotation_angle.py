@@ -0,0 +1,274 @@
+import os
+import numpy as np
+import pandas as pd
+from .time_mapping import match_times, interpolate_angles
+
+
+class RotationAngleBins:
+    def __init__(self):
+        self.turbineOutput_subdir_path = None
+        self.turbine = 0
+        self.times = np.array([])
+        self.angles = np.array([])
+        self.bins = np.array([])
+        self.bin_names = np.array([])
+        self.bin_inds = np.array([], dtype=int)
+
+    def angles_at(
+        self, query_times, time_rtol: float = 1e-5, interpolate_angle: bool = False
+    ) -> np.ndarray:
+        """
+        Rotor angle at every query time.
+
+        Args:
+            query_times (array like): Times to find the rotor angle at.
+            time_rtol (float, optional): Relative tolerance when matching the times to the rotationAngle
+                                         rows. Defaults to 1e-5.
+            interpolate_angle (bool, optional): Interpolate the rotor angle at each time rather than
+                                                taking the angle of the matching row. Defaults to False.
+
+        Raises:
+            LookupError: If a time cannot be found in the rotationAngle times.
+
+        Returns:
+            np.ndarray: Rotor angle in degrees at each time.
+        """
+        if interpolate_angle:
+            return interpolate_angles(query_times, self.times, self.angles, time_rtol)
+        return self.angles[match_times(query_times, self.times, time_rtol)]
+
+    def bin_names_at(
+        self, query_times, time_rtol: float = 1e-5, interpolate_angle: bool = False
+    ) -> np.ndarray:
+        """
+        Name of the bin of every query time (e.g. the time directories of a function object).
+
+        Args:
+            query_times (array like): Times to bin.
+            time_rtol (float, optional): Relative tolerance when matching the times to the rotationAngle
+                                         rows. Defaults to 1e-5.
+            interpolate_angle (bool, optional): Interpolate the rotor angle at each time rather than
+                                                taking the angle of the matching row. Defaults to False.
+
+        Raises:
+            LookupError: If a time cannot be found in the rotationAngle times.
+
+        Returns:
+            np.ndarray: Bin name of each time.
+        """
+        angles = self.angles_at(query_times, time_rtol, interpolate_angle)
+        return self.bin_names[np.digitize(angles, self.bins)]
+
+    def blade_bin_indices(
+        self,
+        query_times,
+        n_blades: int,
+        blade_offsets=None,
+        time_rtol: float = 1e-5,
+        interpolate_angle: bool = False,
+    ) -> np.ndarray:
+        """
+        Bin of every blade at every query time, binning each blade by its own azimuth (the rotor angle
+        plus the blade offset, wrapped into the range of the bins).
+
+        Args:
+            query_times (array like): Times to bin.
+            n_blades (int): Number of blades.
+            blade_offsets (array like, optional): Azimuthal offset of each blade in degrees, measured in
+                                                  the direction of rotation. Defaults to None in which
+                                                  case the blades are evenly spaced from blade 0.
+            time_rtol (float, optional): Relative tolerance when matching the times to the rotationAngle
+                                         rows. Defaults to 1e-5.
+            interpolate_angle (bool, optional): Interpolate the rotor angle at each time rather than
+                                                taking the angle of the matching row. Defaults to False.
+
+        Raises:
+            LookupError: If a time cannot be found in the rotationAngle times.
+            ValueError: If the number of blade offsets does not match n_blades.
+
+        Returns:
+            np.ndarray: (n_times, n_blades) index of the bin of each blade in bin_names[1:], or -1 if
+                        the azimuth is beyond the last bin edge.
+        """
+        if blade_offsets is None:
+            blade_offsets = np.arange(n_blades) * 360 / n_blades
+        blade_offsets = np.asarray(blade_offsets, dtype=float)
+        if len(blade_offsets) != n_blades:
+            raise ValueError(f"{len(blade_offsets)} blade offsets given for {n_blades} blades")
+
+        angles = self.angles_at(query_times, time_rtol, interpolate_angle)
+        direction = 1 if self.bins[0] >= 0 else -1
+        azimuths = np.mod(angles[:, None] + direction * blade_offsets[None, :], 360)
+        # np.mod can round a tiny negative angle up to 360
+        azimuths[azimuths >= 360] = 0
+        azimuths += self.bins[0]
+
+        bin_inds = np.digitize(azimuths, self.bins) - 1
+        bin_inds[bin_inds >= len(self.bins) - 1] = -1
+        return bin_inds
+
+
+def read_rotation_angle(
+    case_path: str,
+    bin_size: float,
+    turbineOutput_subdir: str = None,
+    catalog=None,
+    turbine: int = None,
+) -> RotationAngleBins:
+    """
+    Read the rotationAngle file of a case and set up the phase bins of one turbine.
+
+    Args:
+        case_path (str): path to case
+        bin_size (float): bin size in degrees
+        turbineOutput_subdir (str, optional): Name of turbineOutput subdir. Defaults to None in which case if only one subdir exists it will assume that.
+        catalog (CaseCatalog, optional): Catalog of the case. Defaults to None (a new catalog is made).
+        turbine (int, optional): Turbine to bin. Defaults to None in which case the case must have a
+                                 single turbine.
+
+    Raises:
+        FileExistsError: If turbineOutput, the subdirectory or rotationAngle cannot be found.
+        ValueError: If there are several turbineOutput subdirectories and none is given, or several
+                    turbines and none is given, or the turbine is not in rotationAngle.
+
+    Returns:
+        RotationAngleBins: rotationAngle times and angles, the bin edges and names, and the bin of each row.
+    """
+    rotations = read_rotation_angles(case_path, bin_size, turbineOutput_subdir, catalog)
+
+    if turbine is None:
+        if len(rotations) > 1:
+            raise ValueError(
+                f"rotationAngle has turbines {list(rotations.keys())}, choose one with turbine"
+            )
+        return next(iter(rotations.values()))
+
+    if turbine not in rotations:
+        raise ValueError(f"Turbine {turbine} is not in rotationAngle")
+    return rotations[turbine]
+
+
+def read_rotation_angles(
+    case_path: str, bin_size: float, turbineOutput_subdir: str = None, catalog=None
+) -> dict:
+    """
+    Read the rotationAngle file of a case once and set up the phase bins of every turbine in it, each
+    binned by its own rotor angle.
+
+    Args:
+        case_path (str): path to case
+        bin_size (float): bin size in degrees
+        turbineOutput_subdir (str, optional): Name of turbineOutput subdir. Defaults to None in which case if only one subdir exists it will assume that.
+        catalog (CaseCatalog, optional): Catalog of the case. Defaults to None (a new catalog is made).
+
+    Raises:
+        FileExistsError: If turbineOutput, the subdirectory or rotationAngle cannot be found.
+        ValueError: If there are several turbineOutput subdirectories and none is given.
+
+    Returns:
+        dict: {turbine: RotationAngleBins} in turbine order.
+    """
+    from pyALMTree.read.catalog import CaseCatalog
+
+    if catalog is None:
+        catalog = CaseCatalog(case_path)
+
+    turbineOutput_path = os.path.join(case_path, "turbineOutput")
+    if not catalog.exists("turbineOutput"):
+        raise FileExistsError("Cannot Find turbineOutput")
+
+    subdirs = catalog.subdirs("turbineOutput")
+    if len(subdirs) > 1:
+        if turbineOutput_subdir == None:
+            raise ValueError("No turbineOutput subdirectory provided")
+
+        turbineOutput_subdir_path = os.path.join(
+            turbineOutput_path, turbineOutput_subdir
+        )
+        if not os.path.exists(turbineOutput_subdir_path):
+            raise FileExistsError(
+                "turbineOutput path subdirectory provided does not exist"
+            )
+    else:
+        turbineOutput_subdir_path = os.path.join(turbineOutput_path, subdirs[0])
+
+    rotationAngle_path = os.path.join(turbineOutput_subdir_path, "rotationAngle")
+    if not os.path.exists(rotationAngle_path):
+        raise FileExistsError("turbineOutput/subdir/rotationAngle does not exist")
+
+    df_rotation_angle = pd.read_csv(rotationAngle_path, sep=r"\s+")
+
+    times = df_rotation_angle["Time(s)"].to_numpy(dtype=float)
+    angles = df_rotation_angle["rotAngle(deg)"].to_numpy(dtype=float)
+
+    rotations = {}
+    for turbine, rows in turbine_rows(df_rotation_angle["#Turbine"]).items():
+        result = RotationAngleBins()
+        result.turbineOutput_subdir_path = turbineOutput_subdir_path
+        result.turbine = turbine
+        result.times = times[rows]
+        result.angles = angles[rows]
+
+        # determine the rotation direction
+        if np.max(result.angles) > 0:
+            result.bins = np.arange(0, 360 + bin_size / 2, bin_size)
+        else:
+            result.bins = np.arange(-360, bin_size / 2, bin_size)
+
+        result.bin_inds = np.digitize(result.angles, result.bins)
+
+        bin_names = np.array("outside")
+        for i in range(1, len(result.bins)):
+            bin_names = np.append(bin_names, f"{result.bins[i-1]}_{result.bins[i]}")
+        result.bin_names = bin_names
+
+        rotations[turbine] = result
+
+    return rotations
+
+
+def turbine_rows(turbine_column) -> dict:
+    """
+    Split the rows of a turbineOutput file by turbine with a single stable sort.
+
+    Args:
+        turbine_column (array like): The #Turbine column.
+
+    Returns:
+        dict: {turbine: row indices} in turbine order, the rows of each turbine staying in file order.
+    """
+    turbine_column = np.asarray(turbine_column)
+    order = np.argsort(turbine_column, kind="stable")
+    turbines, starts = np.unique(turbine_column[order], return_index=True)
+    return {
+        int(turbine): rows for turbine, rows in zip(turbines, np.split(order, starts[1:]))
+    }
+
+
+def phaseAveraged_dir_name(name: str, turbine: int, rotations: dict) -> str:
+    """
+    Args:
+        name (str): "postProcessing" or "turbineOutput".
+        turbine (int): Turbine of the results.
+        rotations (dict): {turbine: RotationAngleBins} of the case from read_rotation_angles.
+
+    Returns:
+        str: phaseAveraged-<name> for a single turbine case and phaseAveraged-<name>-turbine<turbine>
+             for each turbine of a multi turbine case.
+    """
+    if len(rotations) == 1:
+        return f"phaseAveraged-{name}"
+    return f"phaseAveraged-{name}-turbine{turbine}"
+
+
+def phaseAveraged_dir_names(case_path: str, name: str) -> list:
+    """
+    Returns:
+        list: Names of the phaseAveraged-<name> directories of a case (see phaseAveraged_dir_name).
+    """
+    return sorted(
+        folder
+        for folder in os.listdir(case_path)
+        if (folder == f"phaseAveraged-{name}" or folder.startswith(f"phaseAveraged-{name}-turbine"))
+        and os.path.isdir(os.path.join(case_path, folder))
+    )
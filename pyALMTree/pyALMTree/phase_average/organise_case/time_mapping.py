@@ -0,0 +1,90 @@
+import numpy as np
+
+
+def match_times(query_times, times, rtol: float = 1e-5) -> np.ndarray:
+    """
+    Map every query time (e.g. the time directory names of a function object) to the nearest row of
+    times (e.g. the Time(s) column of rotationAngle) with a single searchsorted.
+
+    Args:
+        query_times (array like): Times to look up.
+        times (array like): Times to look them up in (need not be sorted).
+        rtol (float, optional): Largest accepted relative difference between a query time and its
+                                nearest time, which absorbs the rounding of OpenFOAM's directory names.
+                                Defaults to 1e-5.
+
+    Raises:
+        LookupError: If a query time has no time within the tolerance.
+
+    Returns:
+        np.ndarray: Index into times of every query time.
+    """
+    query_times = np.asarray(query_times, dtype=float)
+    times = np.asarray(times, dtype=float)
+    if len(query_times) == 0:
+        return np.array([], dtype=int)
+    if len(times) == 0:
+        raise LookupError(f"Could not find sample time {query_times[0]} in rotationAngle times")
+
+    order = np.argsort(times, kind="stable")
+    sorted_times = times[order]
+
+    # candidates either side of the insertion point, the nearest wins (the earlier row on a tie)
+    right = np.searchsorted(sorted_times, query_times, side="left")
+    left = np.clip(right - 1, 0, len(times) - 1)
+    right = np.clip(right, 0, len(times) - 1)
+    use_right = np.abs(sorted_times[right] - query_times) < np.abs(sorted_times[left] - query_times)
+    nearest = np.where(use_right, right, left)
+
+    difference = np.abs(sorted_times[nearest] - query_times)
+    tolerance = rtol * np.maximum(np.abs(query_times), np.abs(sorted_times[nearest]))
+    missing = np.flatnonzero(difference > tolerance)
+    if len(missing) > 0:
+        raise LookupError(
+            f"Could not find sample time {query_times[missing[0]]} in rotationAngle times "
+            f"({len(missing)} time(s) outside rtol={rtol})"
+        )
+
+    return order[nearest]
+
+
+def interpolate_angles(query_times, times, angles, rtol: float = 1e-5) -> np.ndarray:
+    """
+    Linearly interpolate the rotor angle (in degrees) at every query time. The angles are unwrapped
+    before interpolating so that a revolution boundary between two rows is handled, and the result is
+    wrapped back into the range of the input angles ([0, 360) or [-360, 0)).
+
+    Args:
+        query_times (array like): Times at which to find the angle.
+        times (array like): Time of each angle (need not be sorted).
+        angles (array like): Rotor angle in degrees.
+        rtol (float, optional): Relative tolerance for query times just outside the range of times.
+                                Defaults to 1e-5.
+
+    Raises:
+        LookupError: If a query time lies outside the range of times.
+
+    Returns:
+        np.ndarray: Angle at each query time.
+    """
+    query_times = np.asarray(query_times, dtype=float)
+    times = np.asarray(times, dtype=float)
+    angles = np.asarray(angles, dtype=float)
+
+    order = np.argsort(times, kind="stable")
+    times = times[order]
+    unwrapped = np.degrees(np.unwrap(np.radians(angles[order])))
+
+    lower = times[0] - rtol * abs(times[0])
+    upper = times[-1] + rtol * abs(times[-1])
+    outside = np.flatnonzero((query_times < lower) | (query_times > upper))
+    if len(outside) > 0:
+        raise LookupError(
+            f"Could not find sample time {query_times[outside[0]]} in rotationAngle times "
+            f"({len(outside)} time(s) outside [{times[0]}, {times[-1]}])"
+        )
+
+    interpolated = np.interp(query_times, times, unwrapped)
+    if np.max(angles) > 0:
+        return np.mod(interpolated, 360)
+    return np.mod(interpolated, 360) - 360
@@ -5,8 +5,17 @@ def turbineOutput(
     turbineOutput_subdir: str = None,
     organise_rotor_performance: bool = True,
     organise_blade_loads: bool = True,
+    blade_offsets=None,
+    time_rtol: float = 1e-5,
+    interpolate_angle: bool = False,
 ):
-    """_summary_
+    """organise the turbineOutput files for phase averaging. The rotor performance files are written
+    with a bin column and each blade load file gets a <file>_bins.npz holding the bin of every blade at
+    every time, each blade being binned by its own azimuth.
+
+    If rotationAngle has several turbines each turbine is binned by its own rotor angle into its own
+    phaseAveraged-turbineOutput-turbine<i> directory, the rotor performance files being read once and
+    split by turbine.
 
     Args:
         case_path (str): path to case
@@ -15,121 +24,125 @@ def turbineOutput(
         turbineOutput_subdir (str, optional): turbineOutput subdirectory to read from. Defaults to None in which if only one directory exists this will be used..
         organise_rotor_performance (bool, optional): organise the rotor performances. Defaults to True.
         organise_blade_loads (bool, optional): organise the blade loads. Defaults to True.
+        blade_offsets (array like, optional): Azimuthal offset of each blade in degrees, measured in the
+                                              direction of rotation. Defaults to None (evenly spaced).
+        time_rtol (float, optional): Relative tolerance when matching the blade load times to the
+                                     rotationAngle times. Defaults to 1e-5.
+        interpolate_angle (bool, optional): Interpolate the rotor angle at each blade load time rather
+                                            than taking the angle of the matching row. Defaults to False.
     """
     import os
-    import pandas as pd
-    import numpy as np
+    from pyALMTree.read.catalog import CaseCatalog
+    from pyALMTree.phase_average.organise_case.rotation_angle import (
+        read_rotation_angles,
+        phaseAveraged_dir_name,
+    )
+    from pyALMTree.phase_average.calculate.turbineOutput import BLADE_LOAD_FILES
 
-    turbineOutput_path = os.path.join(case_path, "turbineOutput")
-    if not os.path.exists(turbineOutput_path):
-        raise FileExistsError("Cannot Find turbineOutput")
+    catalog = CaseCatalog(case_path)
 
-    subdirs = os.listdir(turbineOutput_path)
-    if len(subdirs) > 1:
-        if turbineOutput_subdir == None:
-            raise ValueError("No turbineOutput subdirectory provided")
+    rotations = read_rotation_angles(case_path, bin_size, turbineOutput_subdir, catalog)
+    turbineOutput_subdir_path = next(iter(rotations.values())).turbineOutput_subdir_path
 
-        turbineOutput_subdir_path = os.path.join(
-            turbineOutput_path, turbineOutput_subdir
+    # create new dirs to place phase avereaged values in
+    phaseAveraged_turbineOutput_paths = {}
+    for turbine in rotations:
+        phaseAveraged_turbineOutput_paths[turbine] = os.path.join(
+            case_path, phaseAveraged_dir_name("turbineOutput", turbine, rotations)
         )
-        if not os.path.exists(turbineOutput_subdir_path):
-            raise FileExistsError(
-                "turbineOutput path subdirectory provided does not exist"
-            )
-    else:
-        turbineOutput_subdir_path = os.path.join(turbineOutput_path, subdirs[0])
-
-    rotationAngle_path = os.path.join(turbineOutput_subdir_path, "rotationAngle")
-    if not os.path.exists(rotationAngle_path):
-        FileExistsError("turbineOutput/subdir/rotationAngle does not exist")
-
-    df_rotation_angle = pd.read_csv(rotationAngle_path, sep=r"\s+")
-
-    # for now assume a single turbine
-    if np.unique(df_rotation_angle["#Turbine"]) != [0]:
-        raise NotImplementedError("More than one turbine - not implemented")
-
-    # determine the rotation direction
-    if np.max(df_rotation_angle["rotAngle(deg)"]) > 0:
-        bins = np.arange(0, 360 + bin_size / 2, bin_size)
-    else:
-        bins = np.arange(-360, bin_size / 2, bin_size)
-
-    times = df_rotation_angle["Time(s)"]
-    times_float = np.array(times, dtype=float)
-    bin_inds = np.digitize(df_rotation_angle["rotAngle(deg)"], bins)
-
-    # create new dir to place phase avereaged values in
-    os.makedirs(os.path.join(case_path, "phaseAveraged-turbineOutput"), exist_ok=True)
-    phaseAveraged_postProcessing_path = os.path.join(
-        case_path, "phaseAveraged-turbineOutput"
-    )
+        os.makedirs(phaseAveraged_turbineOutput_paths[turbine], exist_ok=True)
 
-    for file in os.listdir(turbineOutput_subdir_path):
+    for file in catalog.files("turbineOutput", os.path.basename(turbineOutput_subdir_path)):
         file_path = os.path.join(turbineOutput_subdir_path, file)
 
         if organise_rotor_performance:
             if file in ["thrust", "powerRotor", "torqueRotor"]:
                 print(f"  --organising {file}")
                 _prep_file(
-                    phaseAveraged_postProcessing_path,
+                    phaseAveraged_turbineOutput_paths,
                     file_path,
-                    bins,
-                    bin_inds,
-                    times_float,
+                    rotations,
                     time_start,
                 )
-                None
 
         if organise_blade_loads:
-            if file in ["tangentialForce", "normalForce", "axialForce"]:
-                None
-                # _prep_file(
-                #     phaseAveraged_postProcessing_path,
-                #     file_path,
-                #     bins,
-                #     bin_inds,
-                #     times_float,
-                #     multiple_blades=True,
-                # )
+            if file in BLADE_LOAD_FILES:
+                print(f"  --organising {file}")
+                for turbine, rotation in rotations.items():
+                    _prep_blade_file(
+                        case_path,
+                        phaseAveraged_turbineOutput_paths[turbine],
+                        file_path,
+                        rotation,
+                        time_start,
+                        blade_offsets,
+                        time_rtol,
+                        interpolate_angle,
+                    )
 
 
 def _prep_file(
-    phaseAveraged_turbineOutput_path,
+    phaseAveraged_turbineOutput_paths,
     file_path,
-    bins,
-    bin_inds,
-    times_float,
+    rotations,
     time_start,
-    multiple_blades=False,
 ):
-    import pandas as pd, os, numpy as np
+    import os
+    from pyALMTree.read.turbineOutput import turbineOutput_file
+    from pyALMTree.phase_average.organise_case.rotation_angle import turbine_rows
 
-    df = pd.read_csv(file_path, sep=r"\s+")
+    df = turbineOutput_file(file_path)
 
     if "Time(s)" not in df.keys():
         raise KeyError(f"Time(s) not a key in {file_path}")
 
-    bin_names = np.array("outside")
-    for i in range(1, len(bins)):
-        bin_names = np.append(bin_names, f"{bins[i-1]}_{bins[i]}")
+    # the rows of each turbine line up with its rows of rotationAngle
+    for turbine, rows in turbine_rows(df["#Turbine"]).items():
+        if turbine not in rotations:
+            continue
+        rotation = rotations[turbine]
 
-    if not multiple_blades:
-        df["bin"] = bin_names[bin_inds]
+        turbine_df = df.iloc[rows].reset_index(drop=True)
+        turbine_df["bin"] = rotation.bin_names[rotation.bin_inds]
         destination = os.path.join(
-            phaseAveraged_turbineOutput_path, os.path.basename(file_path)
+            phaseAveraged_turbineOutput_paths[turbine], os.path.basename(file_path)
         )
-        
-        df = df[df["Time(s)"] > time_start]
-        
-        df.to_csv(destination)
-    else:
-        # phases = np.array([])
-        # for time in df["Time(s)"]:
-        #     # print(time)
-        #     ind = np.argmin(np.abs(float(time) == times_float))
-        #     # print(ind)
-
-        # difficult to read in file due to terrible naming system!!!
-
-        raise NotImplementedError("Not implemented")
+
+        turbine_df = turbine_df[turbine_df["Time(s)"] > time_start]
+
+        turbine_df.to_csv(destination)
+
+
+def _prep_blade_file(
+    case_path,
+    phaseAveraged_turbineOutput_path,
+    file_path,
+    rotation,
+    time_start,
+    blade_offsets,
+    time_rtol,
+    interpolate_angle,
+):
+    import os, numpy as np
+    from pyALMTree.read.turbineOutput import turbineOutput_blade_file
+    from pyALMTree.phase_average.calculate.turbineOutput import BLADE_BINS_SUFFIX
+
+    data = turbineOutput_blade_file(file_path, turbine=rotation.turbine)
+
+    time = data.time[data.time > time_start]
+    bin_inds = rotation.blade_bin_indices(
+        time, len(data.blades), blade_offsets, time_rtol, interpolate_angle
+    )
+
+    # only the bins are written, calculate.turbineOutput reads the loads from the case
+    np.savez(
+        os.path.join(
+            phaseAveraged_turbineOutput_path,
+            os.path.basename(file_path) + BLADE_BINS_SUFFIX,
+        ),
+        source=np.array(os.path.relpath(file_path, case_path)),
+        turbine=np.array(rotation.turbine),
+        time=time,
+        bin_inds=bin_inds,
+        bin_names=rotation.bin_names[1:],
+    )
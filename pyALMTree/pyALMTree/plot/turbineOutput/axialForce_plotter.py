@@ -3,7 +3,8 @@ import numpy as np
 from matplotlib.figure import Figure
 from matplotlib.axes import Axes
 from typing import List, Optional, Tuple
-from pyALMTree.read.turbineOutput import turbineOutput_file as read_file
+from pyALMTree.read.catalog import CaseCatalog
+from pyALMTree.read.turbineOutput import turbineOutput_blade_file as read_file
 import PyhD
 
 def axialForce(
@@ -42,7 +43,7 @@ def axialForce(
     PyhD.matplotlib.style.apply_style()
     turbineOutput_path = os.path.join(case_path, "turbineOutput")
     turbineOutput_path = os.path.join(
-        turbineOutput_path, os.listdir(turbineOutput_path)[0]
+        turbineOutput_path, CaseCatalog(case_path).time_dirs("turbineOutput")[0]
     )
     axialForce_path = os.path.join(turbineOutput_path, "axialForce")
     radius_path = os.path.join(turbineOutput_path, "radiusC")
@@ -55,18 +56,17 @@ def axialForce(
     if verbose:
         print(f"plotting axialForce")
 
-    df = read_file(axialForce_path, blade_data_file=True)
-    df_radius = read_file(radius_path, blade_data_file=True)
-    radius = np.array(df_radius[df_radius["Blade"] == 0]["radiusC(m)"][0])
+    result = read_file(axialForce_path)
+    radius = read_file(radius_path).values[0, 0]
         
     axialForce_arr = []
     radius_arr = []
     plot_times_arr = []
         
     for ind, target_time in enumerate(plot_time_targets):        
-        row_index = np.argmin(np.abs(df["Time(s)"] - target_time))  
-        row_time_value = df["Time(s)"][row_index]
-        axialForce_arr.append(df["axial force (N)"][row_index])
+        time_index = np.argmin(np.abs(result.time - target_time))
+        row_time_value = result.time[time_index]
+        axialForce_arr.append(result.values[time_index, 0])
         radius_arr.append(radius)
         plot_times_arr.append(row_time_value)
     
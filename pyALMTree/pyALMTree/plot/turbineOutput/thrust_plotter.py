@@ -1,6 +1,7 @@
 import matplotlib.pyplot as plt
 import numpy as np
 import os
+from pyALMTree.read.catalog import CaseCatalog
 from pyALMTree.read.turbineOutput import turbineOutput_file as read_file
 import PyhD
 
@@ -9,7 +10,7 @@ def thrust(case_path, time_series_limits=[0,1000], verbose=True, save_path=None)
     PyhD.matplotlib.style.apply_style()
     turbineOutput_path = os.path.join(case_path, "turbineOutput")
     turbineOutput_path = os.path.join(
-        turbineOutput_path, os.listdir(turbineOutput_path)[0]
+        turbineOutput_path, CaseCatalog(case_path).time_dirs("turbineOutput")[0]
     )
     thrust_path = os.path.join(turbineOutput_path, "thrust")
 
@@ -19,9 +20,9 @@ def thrust(case_path, time_series_limits=[0,1000], verbose=True, save_path=None)
     if verbose:
         print(f"plotting thrust")
 
-    df = read_file(thrust_path)
-    df = df[df["Time(s)"] >= time_series_limits[0]]
-    df = df[df["Time(s)"] <= time_series_limits[1]]
+    df = read_file(
+        thrust_path, t_min=time_series_limits[0], t_max=time_series_limits[1]
+    )
     
     figure, axs = PyhD.matplotlib.plot_helpers.landscape_fig(
         fig_name="Thrust",
@@ -47,7 +48,7 @@ def thrust_FFT(case_path, time_series_limits=[0,1000], verbose=True, save_path=N
     PyhD.matplotlib.style.apply_style()
     turbineOutput_path = os.path.join(case_path, "turbineOutput")
     turbineOutput_path = os.path.join(
-        turbineOutput_path, os.listdir(turbineOutput_path)[0]
+        turbineOutput_path, CaseCatalog(case_path).time_dirs("turbineOutput")[0]
     )
     thrust_path = os.path.join(turbineOutput_path, "thrust")
 
@@ -57,9 +58,9 @@ def thrust_FFT(case_path, time_series_limits=[0,1000], verbose=True, save_path=N
     if verbose:
         print(f"plotting thrust FFT")
 
-    df = read_file(thrust_path)
-    df = df[df["Time(s)"] >= time_series_limits[0]]
-    df = df[df["Time(s)"] <= time_series_limits[1]]
+    df = read_file(
+        thrust_path, t_min=time_series_limits[0], t_max=time_series_limits[1]
+    )
 
     timeseries = np.array(df["thrust (N)"])
     timevalues = np.array(df["Time(s)"])
@@ -99,7 +100,7 @@ def thrust_details(case_path, time_series_limits=[0,1000], verbose=True, save_pa
     PyhD.matplotlib.style.apply_style()
     turbineOutput_path = os.path.join(case_path, "turbineOutput")
     turbineOutput_path = os.path.join(
-        turbineOutput_path, os.listdir(turbineOutput_path)[0]
+        turbineOutput_path, CaseCatalog(case_path).time_dirs("turbineOutput")[0]
     )
     thrust_path = os.path.join(turbineOutput_path, "thrust")
 
@@ -109,9 +110,9 @@ def thrust_details(case_path, time_series_limits=[0,1000], verbose=True, save_pa
     if verbose:
         print(f"plotting thrust details")
 
-    df = read_file(thrust_path)
-    df = df[df["Time(s)"] >= time_series_limits[0]]
-    df = df[df["Time(s)"] <= time_series_limits[1]]
+    df = read_file(
+        thrust_path, t_min=time_series_limits[0], t_max=time_series_limits[1]
+    )
 
     timeseries = np.array(df["thrust (N)"])
     timevalues = np.array(df["Time(s)"])
@@ -160,7 +161,7 @@ def thrust_FFT_log_log(case_path, time_series_limits=[0,1000], verbose=True, sav
     PyhD.matplotlib.style.apply_style()
     turbineOutput_path = os.path.join(case_path, "turbineOutput")
     turbineOutput_path = os.path.join(
-        turbineOutput_path, os.listdir(turbineOutput_path)[0]
+        turbineOutput_path, CaseCatalog(case_path).time_dirs("turbineOutput")[0]
     )
     thrust_path = os.path.join(turbineOutput_path, "thrust")
 
@@ -170,9 +171,9 @@ def thrust_FFT_log_log(case_path, time_series_limits=[0,1000], verbose=True, sav
     if verbose:
         print(f"plotting thrust FFT log-log")
 
-    df = read_file(thrust_path)
-    df = df[df["Time(s)"] >= time_series_limits[0]]
-    df = df[df["Time(s)"] <= time_series_limits[1]]
+    df = read_file(
+        thrust_path, t_min=time_series_limits[0], t_max=time_series_limits[1]
+    )
 
     timeseries = np.array(df["thrust (N)"])
     timevalues = np.array(df["Time(s)"])
@@ -1,8 +1,12 @@
-from .turbineOutput import turbineOutput_file
+from .turbineOutput import turbineOutput_file, turbineOutput_blade_file
 from .case import CaseReader
-from .postProcessing_probe import postProcessing_probe_file
-from .postProcessing_sample import postProcessing_sample_file
+from .catalog import CaseCatalog
+from .postProcessing_probe import postProcessing_probe_file, postProcessing_probe_array, postProcessing_probe_chunks, postProcessing_probe_memmap
+from .postProcessing_sample import postProcessing_sample_file, postProcessing_sample_series
+from .postProcessing_surface import postProcessing_surface_file, write_surface_file, surface_layout
+from .live import LiveTurbineOutputReader, LiveProbeReader
+from .cache import set_cache_options, get_cache_options, clear_cache
 
-__all__ = ["turbineOutput_file", "CaseReader", "postProcessing_sample_file", "postProcessing_probe_file"]
+__all__ = ["turbineOutput_file", "turbineOutput_blade_file", "CaseReader", "CaseCatalog", "postProcessing_sample_file", "postProcessing_sample_series", "postProcessing_surface_file", "write_surface_file", "surface_layout", "postProcessing_probe_file", "postProcessing_probe_array", "postProcessing_probe_chunks", "postProcessing_probe_memmap", "LiveTurbineOutputReader", "LiveProbeReader", "set_cache_options", "get_cache_options", "clear_cache"]
 
 
@@ -0,0 +1,248 @@
+import os
+import json
+import hashlib
+import tempfile
+import warnings
+import numpy as np
+import pandas as pd
+from typing import Callable, Dict, Tuple
+
+# bump this whenever the layout of a cached entry changes
+CACHE_VERSION = 1
+
+_cache_options = {
+    "enabled": os.environ.get("PYALMTREE_CACHE", "1") != "0",
+    "cache_dir": os.environ.get(
+        "PYALMTREE_CACHE_DIR",
+        os.path.join(
+            os.environ.get("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache")),
+            "pyALMTree",
+        ),
+    ),
+    "max_size": 5 * 1024**3,
+    "min_file_size": 1024**2,
+}
+
+
+def set_cache_options(
+    enabled: bool = None,
+    cache_dir: str = None,
+    max_size: int = None,
+    min_file_size: int = None,
+):
+    """
+    Configure the on-disk cache used by the readers in pyALMTree.read.
+
+    Parsed files are stored as an uncompressed .npz plus a small JSON header in cache_dir. An entry is
+    rebuilt whenever the size or modification time of the source file changes, and the least recently
+    used entries are evicted once the cache directory grows beyond max_size.
+
+    Args:
+        enabled (bool, optional): Turn the cache on or off. Defaults to None (unchanged).
+        cache_dir (str, optional): Directory in which to store the cache. Defaults to None (unchanged).
+        max_size (int, optional): Maximum size of the cache directory in bytes. Defaults to None (unchanged).
+        min_file_size (int, optional): Files smaller than this (in bytes) are never cached. Defaults to None (unchanged).
+    """
+    if enabled is not None:
+        _cache_options["enabled"] = enabled
+    if cache_dir is not None:
+        _cache_options["cache_dir"] = cache_dir
+    if max_size is not None:
+        _cache_options["max_size"] = max_size
+    if min_file_size is not None:
+        _cache_options["min_file_size"] = min_file_size
+
+
+def get_cache_options() -> dict:
+    """
+    Returns:
+        dict: A copy of the current cache options.
+    """
+    return dict(_cache_options)
+
+
+def clear_cache():
+    """
+    Remove every entry from the cache directory.
+    """
+    for header_path, _, _ in _list_entries(_cache_options["cache_dir"]):
+        _remove_entry(header_path)
+
+
+def cached_read(
+    file_path: str,
+    kind: str,
+    params: dict,
+    parse: Callable[[], object],
+    pack: Callable[[object], Tuple[Dict[str, np.ndarray], dict]],
+    unpack: Callable[[Dict[str, np.ndarray], dict], object],
+    use_cache: bool = True,
+):
+    """
+    Serve a parsed file from the cache, parsing and storing it if no valid entry exists.
+
+    Args:
+        file_path (str): Path to the source file.
+        kind (str): Name of the reader (entries of different readers never collide).
+        params (dict): JSON serialisable reader options that change the parsed result.
+        parse (Callable): Parses the source file.
+        pack (Callable): Converts the parsed result into (arrays, meta). May return None if the result
+                         cannot be cached.
+        unpack (Callable): Rebuilds the parsed result from (arrays, meta).
+        use_cache (bool, optional): If False the cache is bypassed. Defaults to True.
+
+    Returns:
+        object: The parsed result.
+    """
+    if not (use_cache and _cache_options["enabled"]):
+        return parse()
+
+    stat = os.stat(file_path)
+    if stat.st_size < _cache_options["min_file_size"]:
+        return parse()
+
+    cache_dir = _cache_options["cache_dir"]
+    source = os.path.realpath(file_path)
+    key_str = json.dumps([source, kind, params], sort_keys=True)
+    key = hashlib.sha1(key_str.encode()).hexdigest()
+    header_path = os.path.join(cache_dir, key + ".json")
+    data_path = os.path.join(cache_dir, key + ".npz")
+
+    header = _read_header(header_path)
+    if (
+        header is not None
+        and header["version"] == CACHE_VERSION
+        and header["source"] == source
+        and header["size"] == stat.st_size
+        and header["mtime_ns"] == stat.st_mtime_ns
+    ):
+        try:
+            with np.load(data_path, allow_pickle=False) as npz:
+                arrays = {name: npz[name] for name in npz.files}
+            # touch the header so eviction is least recently used
+            os.utime(header_path)
+            return unpack(arrays, header["meta"])
+        except (OSError, ValueError, KeyError):
+            _remove_entry(header_path)
+
+    result = parse()
+
+    packed = pack(result)
+    if packed is None:
+        return result
+    arrays, meta = packed
+
+    header = {
+        "version": CACHE_VERSION,
+        "source": source,
+        "kind": kind,
+        "params": params,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "meta": meta,
+    }
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        _write_entry(cache_dir, header_path, data_path, header, arrays)
+        _evict(cache_dir, _cache_options["max_size"])
+    except OSError as e:
+        warnings.warn(f"Could not write cache entry for {file_path}: {e}", UserWarning)
+
+    return result
+
+
+def _read_header(header_path):
+    try:
+        with open(header_path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_entry(cache_dir, header_path, data_path, header, arrays):
+    # write to temporary files and move them into place so a reader never sees half an entry
+    fd, tmp_data_path = tempfile.mkstemp(dir=cache_dir, suffix=".npz.tmp")
+    with os.fdopen(fd, "wb") as f:
+        np.savez(f, **arrays)
+    os.replace(tmp_data_path, data_path)
+
+    fd, tmp_header_path = tempfile.mkstemp(dir=cache_dir, suffix=".json.tmp")
+    with os.fdopen(fd, "w") as f:
+        json.dump(header, f)
+    os.replace(tmp_header_path, header_path)
+
+
+def _remove_entry(header_path):
+    for path in (header_path, header_path[: -len(".json")] + ".npz"):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def _list_entries(cache_dir):
+    entries = []
+    if not os.path.isdir(cache_dir):
+        return entries
+    for file_name in os.listdir(cache_dir):
+        if not file_name.endswith(".json"):
+            continue
+        header_path = os.path.join(cache_dir, file_name)
+        data_path = header_path[: -len(".json")] + ".npz"
+        try:
+            header_stat = os.stat(header_path)
+            size = header_stat.st_size + os.path.getsize(data_path)
+        except OSError:
+            continue
+        entries.append((header_path, header_stat.st_mtime, size))
+    return entries
+
+
+def _evict(cache_dir, max_size):
+    entries = _list_entries(cache_dir)
+    total_size = sum(size for _, _, size in entries)
+    if total_size <= max_size:
+        return
+
+    # least recently used first
+    for header_path, _, size in sorted(entries, key=lambda entry: entry[1]):
+        if total_size <= max_size:
+            break
+        _remove_entry(header_path)
+        total_size -= size
+
+
+def pack_dataframe(df) -> Tuple[Dict[str, np.ndarray], dict]:
+    """
+    Convert a DataFrame of numeric columns (and object columns holding equal length arrays such as
+    the blade distribution of turbineOutput_file) into arrays that can be cached.
+
+    Returns:
+        Tuple[Dict[str, np.ndarray], dict]: The arrays and meta data, or None if a column cannot be cached.
+    """
+    arrays = {}
+    stacked = []
+    for ind, column in enumerate(df.columns):
+        values = df[column].to_numpy()
+        if values.dtype == object:
+            if len(values) == 0 or not isinstance(values[0], np.ndarray):
+                return None
+            values = np.stack(values)
+            stacked.append(ind)
+        elif values.dtype.kind not in "biuf":
+            return None
+        arrays[f"c{ind}"] = values
+    return arrays, {"columns": [str(column) for column in df.columns], "stacked": stacked}
+
+
+def unpack_dataframe(arrays: Dict[str, np.ndarray], meta: dict):
+    """
+    Inverse of pack_dataframe.
+    """
+    data = {}
+    for ind, column in enumerate(meta["columns"]):
+        values = arrays[f"c{ind}"]
+        if ind in meta["stacked"]:
+            values = [row for row in values]
+        data[column] = values
+    return pd.DataFrame(data)
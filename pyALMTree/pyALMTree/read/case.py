@@ -1,6 +1,9 @@
 from . import turbineOutput
 from . import postProcessing_sample
 from . import postProcessing_probe
+from . import restarts
+from .postProcessing_sample import SampleSeries
+from .catalog import CaseCatalog
 import os
 import warnings
 import pandas as pd
@@ -19,8 +22,10 @@ class CaseReader:
     Attributes:
         path (str): The root directory of the case.
         name (str): The name of the case directory (basename of the path).
-        turbineOutput_path (str): Path to the "turbineOutput/0" directory.
+        turbineOutput_path (str): Path to the first "turbineOutput/<startTime>" directory.
+        turbineOutput_time_dirs (list[str]): Every turbineOutput restart directory, sorted by time.
         postProcessing_path (str): Path to the "postProcessing" directory.
+        catalog (CaseCatalog): Catalog of the case directories used for every lookup.
     """
 
     def __init__(self, path_, warnings_on=True):
@@ -31,26 +36,47 @@ class CaseReader:
             path_ (str): Path to the root directory of the case.
 
         Raises:
-            UserWarning: If the "turbineOutput/0" or "postProcessing" directories do not exist.
+            UserWarning: If the "turbineOutput/<startTime>" or "postProcessing" directories do not exist.
         """
         self.path = path_
         self.name = os.path.basename(path_)
+        self.catalog = CaseCatalog(path_)
 
-        self.turbineOutput_path = os.path.join(path_, "turbineOutput", "0")
-        if not os.path.exists(self.turbineOutput_path):
+        turbineOutput_root = os.path.join(path_, "turbineOutput")
+        if self.catalog.exists("turbineOutput"):
+            self.turbineOutput_time_dirs = self.catalog.time_dirs("turbineOutput")
+        else:
+            self.turbineOutput_time_dirs = []
+
+        if len(self.turbineOutput_time_dirs) > 0:
+            self.turbineOutput_path = os.path.join(
+                turbineOutput_root, self.turbineOutput_time_dirs[0]
+            )
+        else:
+            self.turbineOutput_path = os.path.join(turbineOutput_root, "0")
+
+        if len(self.turbineOutput_time_dirs) == 0:
             if warnings_on:
                 warnings.warn(f"The file turbineOutput does not exist!", UserWarning)
             self.turbineOutput_files = None
         else:
-            self.turbineOutput_files = os.listdir(self.turbineOutput_path)
+            self.turbineOutput_files = sorted(
+                set(
+                    file_name
+                    for time_dir in self.turbineOutput_time_dirs
+                    for file_name in self.catalog.files("turbineOutput", time_dir)
+                )
+            )
 
         self.postProcessing_path = os.path.join(path_, "postProcessing")
-        if not os.path.exists(self.postProcessing_path):
+        if not self.catalog.exists("postProcessing"):
             if warnings_on:
                 warnings.warn(f"The file postProcessing does not exist!", UserWarning)
             self.postProcessing_files = None
         else:
-            self.postProcessing_files = os.listdir(self.postProcessing_path)
+            self.postProcessing_files = self.catalog.subdirs("postProcessing") + self.catalog.files(
+                "postProcessing"
+            )
 
     def set_path(self, path_):
         """
@@ -60,36 +86,82 @@ class CaseReader:
             path_ (str): The new path to the root directory of the case.
         """
         self.path = path_
+        self.catalog = CaseCatalog(path_)
 
-    def turbineOutput(self, file_name, blade_data_file=False, change_time_dir_to=""):
+    def turbineOutput(
+        self,
+        file_name,
+        blade_data_file=False,
+        change_time_dir_to="",
+        dense_blade_data=False,
+        dtype=np.float64,
+        t_min=None,
+        t_max=None,
+    ):
         """
         Processes a turbine output file and returns its data as a DataFrame.
 
+        If the case has been restarted the file in every turbineOutput/<startTime> directory is read
+        and stitched into one monotonic time series, where overlapping times are taken from the later
+        restart.
+
         Args:
             file_name (str): Name of the turbine output file.
             blade_data_file (bool, optional): If True, specifies that the file contains
                                               blade-specific data. Defaults to False.
-            change_time_dir_to (str, optional): If provided, the time directory will be 
-                                                changed from 0 to the provided value.
+            change_time_dir_to (str, optional): If provided, only this time directory is read rather
+                                                than stitching every restart.
+            dense_blade_data (bool, optional): If True, the blade distribution is returned as a
+                                               BladeDataResult with a dense (time, blade, element)
+                                               array. Defaults to False.
+            dtype (type, optional): dtype of the dense blade distribution. Defaults to np.float64.
+            t_min (float, optional): Only read rows with t_min <= Time(s). Defaults to None.
+            t_max (float, optional): Only read rows with Time(s) <= t_max. Defaults to None.
 
         Raises:
             FileNotFoundError: If the specified file does not exist in the turbineOutput directory.
 
         Returns:
-            pd.DataFrame: DataFrame containing the turbine output data.
+            pd.DataFrame: DataFrame containing the turbine output data (or a BladeDataResult if
+                          dense_blade_data is True).
         """
-        file_path = os.path.join(self.turbineOutput_path, file_name)
-
         if change_time_dir_to != "":
-            file_path = os.path.join(
-                self.turbineOutput_path, "..", change_time_dir_to, file_name
+            file_paths = [
+                os.path.join(self.turbineOutput_path, "..", change_time_dir_to, file_name)
+            ]
+        else:
+            file_paths = [
+                os.path.join(self.path, "turbineOutput", time_dir, file_name)
+                for time_dir in self.turbineOutput_time_dirs
+            ]
+        file_paths = [
+            file_path
+            for file_path in file_paths
+            if self.catalog.exists(os.path.relpath(file_path, self.path))
+        ]
+
+        if len(file_paths) == 0:
+            raise FileNotFoundError(f"{file_name} cannot be found!")
+
+        def read(file_path):
+            if dense_blade_data:
+                return turbineOutput.turbineOutput_blade_file(
+                    file_path, dtype=dtype, t_min=t_min, t_max=t_max
+                )
+            return turbineOutput.turbineOutput_file(
+                file_path, blade_data_file=blade_data_file, t_min=t_min, t_max=t_max
             )
 
-        if not os.path.exists(file_path):
-            raise FileNotFoundError(f"{file_name} cannot be found!")
-        return turbineOutput.turbineOutput_file(
-            file_path, blade_data_file=blade_data_file
-        )
+        if len(file_paths) == 1:
+            return read(file_paths[0])
+
+        time_column = turbineOutput._read_headers(file_paths[0]).index("Time(s)")
+        plan = restarts.plan_segments(file_paths, time_column, t_min, t_max)
+        segments = [read(file_path) for file_path, _ in plan]
+        cutoffs = [cutoff for _, cutoff in plan]
+        if dense_blade_data:
+            return restarts.stitch_blade_results(segments, cutoffs)
+        return restarts.stitch_dataframes(segments, cutoffs, "Time(s)")
 
     def turbineOutput_exists(self):
         """
@@ -121,17 +193,17 @@ class CaseReader:
         avoid_variables: list[str] = [],
     ) -> Dict[str, pd.DataFrame]:
         sample_subdir_path = os.path.join(self.postProcessing_path, sample_subdir_name)
-        if not os.path.exists(sample_subdir_path):
+        if not self.catalog.exists("postProcessing", sample_subdir_name):
             raise FileExistsError(f"Cannot find dir: {sample_subdir_path}")
 
-        times_str = os.listdir(sample_subdir_path)
-        times_float = np.array(times_str, dtype=float)
+        times_str = self.catalog.time_dirs("postProcessing", sample_subdir_name)
+        times_float = self.catalog.times("postProcessing", sample_subdir_name)
         time_ind = np.argmin(np.abs(times_float - target_time))
 
         time_dir_name = times_str[time_ind]
         time_dir_path = os.path.join(sample_subdir_path, time_dir_name)
 
-        file_names = os.listdir(time_dir_path)
+        file_names = self.catalog.files("postProcessing", sample_subdir_name, time_dir_name)
         data_dict = {}
         for file_name in file_names:
             if not any(var in file_name for var in read_variables):
@@ -147,20 +219,117 @@ class CaseReader:
 
         return data_dict
 
+    def postProcessing_sample_series(
+        self,
+        sample_subdir_name: str,
+        read_variables: list[str],
+        t_min: float = None,
+        t_max: float = None,
+        stride: int = 1,
+        avoid_variables: list[str] = [],
+        dtype: type = np.float64,
+        n_workers: int = None,
+    ) -> Dict[str, SampleSeries]:
+        """
+        Read every sample file matching read_variables over a range of times, rather than the single
+        time of postProcessing_sample (see postProcessing_sample.postProcessing_sample_series).
+
+        Args:
+            sample_subdir_name (str): Name of the sample function object in postProcessing.
+            read_variables (list[str]): Read the files whose name contains any of these.
+            t_min (float, optional): Only read times with t_min <= time. Defaults to None.
+            t_max (float, optional): Only read times with time <= t_max. Defaults to None.
+            stride (int, optional): Read every stride-th time directory within the window. Defaults to 1.
+            avoid_variables (list[str], optional): Skip the files whose name contains any of these. Defaults to [].
+            dtype (type, optional): dtype of the values arrays. Defaults to np.float64.
+            n_workers (int, optional): Number of reader threads. Defaults to the executor default.
+
+        Raises:
+            FileExistsError: If the sample directory does not exist.
+
+        Returns:
+            Dict[str, SampleSeries]: (time, point, variable) arrays keyed by file name.
+        """
+        sample_subdir_path = os.path.join(self.postProcessing_path, sample_subdir_name)
+        if not self.catalog.exists("postProcessing", sample_subdir_name):
+            raise FileExistsError(f"Cannot find dir: {sample_subdir_path}")
+
+        time_dirs = self.catalog.time_dirs("postProcessing", sample_subdir_name)
+        time_dir_files = {
+            time_dir: self.catalog.files("postProcessing", sample_subdir_name, time_dir)
+            for time_dir in time_dirs
+        }
+        file_names = []
+        for time_dir in time_dirs:
+            for file_name in time_dir_files[time_dir]:
+                if file_name not in file_names:
+                    file_names.append(file_name)
+
+        data_dict = {}
+        for file_name in file_names:
+            if not any(var in file_name for var in read_variables):
+                continue
+
+            if any(var in file_name for var in avoid_variables):
+                continue
+
+            data_dict[file_name] = postProcessing_sample.postProcessing_sample_series(
+                sample_subdir_path,
+                file_name,
+                t_min=t_min,
+                t_max=t_max,
+                stride=stride,
+                dtype=dtype,
+                n_workers=n_workers,
+                time_dir_names=[
+                    time_dir for time_dir in time_dirs if file_name in time_dir_files[time_dir]
+                ],
+            )
+
+        return data_dict
+
     def postProcessing_probe(
         self,
         probe_subdir_name: str,
         read_variables: list[str],
-        probe_start_time: str = "0",
+        probe_start_time: str = None,
         avoid_variables: list[str] = [],
+        t_min: float = None,
+        t_max: float = None,
     ) -> Dict[str, Dict[str, any]]:
-        probe_subdir_path = os.path.join(
-            self.postProcessing_path, probe_subdir_name, probe_start_time
-        )
-        if not os.path.exists(probe_subdir_path):
-            raise FileExistsError(f"Cannot find dir: {probe_subdir_path}")
+        """
+        Read the probe files of a probe function object. Unless probe_start_time is given, the files in
+        every time directory (i.e. every restart) are stitched into one monotonic time series where
+        overlapping times are taken from the later restart.
+        """
+        probe_path = os.path.join(self.postProcessing_path, probe_subdir_name)
+        if probe_start_time is not None:
+            probe_time_dirs = [probe_start_time]
+        elif self.catalog.exists("postProcessing", probe_subdir_name):
+            probe_time_dirs = self.catalog.time_dirs("postProcessing", probe_subdir_name)
+        else:
+            probe_time_dirs = []
+
+        if len(probe_time_dirs) == 0 or not all(
+            self.catalog.exists("postProcessing", probe_subdir_name, time_dir)
+            for time_dir in probe_time_dirs
+        ):
+            raise FileExistsError(f"Cannot find dir: {probe_path}")
+
+        probe_files = {
+            os.path.join(probe_path, time_dir): self.catalog.files(
+                "postProcessing", probe_subdir_name, time_dir
+            )
+            for time_dir in probe_time_dirs
+        }
+        probe_subdir_paths = list(probe_files.keys())
+
+        file_names = []
+        for probe_subdir_path in probe_subdir_paths:
+            for file_name in probe_files[probe_subdir_path]:
+                if file_name not in file_names:
+                    file_names.append(file_name)
 
-        file_names = os.listdir(probe_subdir_path)
         data_dict = {}
         for file_name in file_names:
             if not any(var in file_name for var in read_variables):
@@ -169,8 +338,26 @@ class CaseReader:
             if any(var in file_name for var in avoid_variables):
                 continue
 
-            file_path = os.path.join(probe_subdir_path, file_name)
-            df = postProcessing_probe.postProcessing_probe_file(file_path)
+            file_paths = [
+                os.path.join(probe_subdir_path, file_name)
+                for probe_subdir_path in probe_subdir_paths
+                if file_name in probe_files[probe_subdir_path]
+            ]
+            if len(file_paths) == 1:
+                df = postProcessing_probe.postProcessing_probe_file(
+                    file_paths[0], t_min=t_min, t_max=t_max
+                )
+            else:
+                plan = restarts.plan_segments(file_paths, 0, t_min, t_max)
+                df = restarts.stitch_probe_dicts(
+                    [
+                        postProcessing_probe.postProcessing_probe_file(
+                            file_path, t_min=t_min, t_max=t_max
+                        )
+                        for file_path, _ in plan
+                    ],
+                    [cutoff for _, cutoff in plan],
+                )
             data_dict[file_name] = df
 
         return data_dict
@@ -0,0 +1,277 @@
+import os
+import json
+import time
+import tempfile
+import warnings
+import numpy as np
+from typing import Dict, List
+
+# name of the catalog file written in the case directory
+CATALOG_FILE_NAME = ".pyALMTree_catalog.json"
+
+# bump this whenever the layout of the catalog file changes
+CATALOG_VERSION = 2
+
+# a directory modified this close to (or after) the time it was listed may have changed again within
+# the resolution of its modification time, so it is listed again on the next refresh
+RACY_WINDOW_NS = 2_000_000_000
+
+# directories of a case that are catalogued and the number of levels scanned (including themselves)
+CATALOG_ROOTS = {"turbineOutput": 2, "postProcessing": 3}
+
+
+class CaseCatalog:
+    """
+    Catalog of the turbineOutput and postProcessing directories of a case.
+
+    The directory tree is listed once and the sub directories, time directories (sorted numerically)
+    and file sizes of every directory are recorded. The catalog is persisted in the case directory and
+    on refresh only the directories whose modification time has changed are listed again, so looking
+    up the time directories of a sample function object with tens of thousands of writes costs a stat
+    per directory rather than a listing.
+
+    Each root of CATALOG_ROOTS is brought up to date the first time it is used, so looking up
+    turbineOutput never touches the directories of postProcessing.
+
+    As directory modification times only change when entries are added or removed, the recorded size
+    of a file that is still being written to may be out of date until refresh(rescan=True).
+
+    Filesystems with coarse timestamps (e.g. 1 s on Lustre) can give a directory the same modification
+    time before and after an entry is added, so a directory whose modification time is within
+    RACY_WINDOW_NS of when it was listed is not trusted and is listed again on every refresh until it
+    settles (as git does for racily clean files).
+
+    Attributes:
+        case_path (str): Path to the case.
+        persist (bool): Whether the catalog is loaded from and saved to the case directory.
+    """
+
+    def __init__(self, case_path: str, persist: bool = True):
+        """
+        Args:
+            case_path (str): Path to the case.
+            persist (bool, optional): Load and save the catalog in the case directory. Defaults to True.
+        """
+        self.case_path = case_path
+        self.persist = persist
+        self._relisted = False
+        # roots that are up to date, the others are scanned on first use
+        self._scanned = set()
+        self._dirs = {}
+        if persist:
+            self._dirs = {
+                rel_path: entry
+                for rel_path, entry in self._load().items()
+                if _root_of(rel_path) in CATALOG_ROOTS
+            }
+
+    @property
+    def catalog_path(self) -> str:
+        return os.path.join(self.case_path, CATALOG_FILE_NAME)
+
+    def refresh(self, rescan: bool = False) -> bool:
+        """
+        Bring every root of the catalog up to date, listing only the directories that have changed.
+
+        Args:
+            rescan (bool, optional): List every directory again regardless of its modification time.
+                                     Defaults to False.
+
+        Returns:
+            bool: True if anything changed.
+        """
+        if rescan:
+            self._dirs = {}
+
+        # directories listed directly are outside the roots and are listed again on their next use
+        for rel_path in [rel_path for rel_path in self._dirs if _root_of(rel_path) not in CATALOG_ROOTS]:
+            del self._dirs[rel_path]
+
+        return self._refresh_roots(list(CATALOG_ROOTS))
+
+    def _refresh_roots(self, roots: list) -> bool:
+        changed = False
+        self._relisted = False
+        for root in roots:
+            dirs = {}
+            changed |= self._scan(root, CATALOG_ROOTS[root], dirs)
+            previous = [rel_path for rel_path in self._dirs if _root_of(rel_path) == root]
+            changed |= dirs.keys() != set(previous)
+            for rel_path in previous:
+                del self._dirs[rel_path]
+            self._dirs.update(dirs)
+            self._scanned.add(root)
+
+        # a racy directory that was listed again has a new listing time even if nothing changed
+        if (changed or self._relisted) and self.persist:
+            self.save()
+        return changed
+
+    def _use(self, rel_path: str):
+        root = _root_of(rel_path)
+        if root in CATALOG_ROOTS and root not in self._scanned:
+            self._refresh_roots([root])
+
+    def save(self):
+        """
+        Write the catalog to the case directory.
+        """
+        data = {"version": CATALOG_VERSION, "dirs": self._dirs}
+        try:
+            # write to a temporary file and move it into place so a reader never sees half a catalog
+            fd, tmp_path = tempfile.mkstemp(dir=self.case_path, suffix=".json.tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.catalog_path)
+        except OSError as e:
+            warnings.warn(f"Could not save the case catalog of {self.case_path}: {e}", UserWarning)
+
+    def exists(self, *path_parts: str) -> bool:
+        """
+        Args:
+            *path_parts (str): Path relative to the case, e.g. ("postProcessing", "sample").
+
+        Returns:
+            bool: True if the path is a catalogued directory or file.
+        """
+        rel_path = os.path.join(*path_parts)
+        self._use(rel_path)
+        if rel_path in self._dirs:
+            return True
+        parent = self._dirs.get(os.path.dirname(rel_path))
+        return parent is not None and os.path.basename(rel_path) in parent["files"]
+
+    def subdirs(self, *path_parts: str) -> List[str]:
+        """
+        Returns:
+            List[str]: Sorted names of the sub directories of a directory relative to the case.
+        """
+        return list(self._entry(path_parts)["dirs"])
+
+    def time_dirs(self, *path_parts: str) -> List[str]:
+        """
+        Returns:
+            List[str]: Names of the time directories of a directory relative to the case, sorted numerically.
+        """
+        return list(self._entry(path_parts)["time_dirs"])
+
+    def times(self, *path_parts: str) -> np.ndarray:
+        """
+        Returns:
+            np.ndarray: Times of the time directories of a directory relative to the case, sorted.
+        """
+        return np.array(self._entry(path_parts)["time_dirs"], dtype=float)
+
+    def files(self, *path_parts: str) -> List[str]:
+        """
+        Returns:
+            List[str]: Sorted names of the files in a directory relative to the case.
+        """
+        return sorted(self._entry(path_parts)["files"])
+
+    def file_sizes(self, *path_parts: str) -> Dict[str, int]:
+        """
+        Returns:
+            Dict[str, int]: Size in bytes of every file in a directory relative to the case.
+        """
+        return dict(self._entry(path_parts)["files"])
+
+    def function_objects(self) -> List[str]:
+        """
+        Returns:
+            List[str]: Names of the function object directories in postProcessing.
+        """
+        self._use("postProcessing")
+        if "postProcessing" not in self._dirs:
+            return []
+        return self.subdirs("postProcessing")
+
+    def _entry(self, path_parts) -> dict:
+        rel_path = os.path.join(*path_parts)
+        self._use(rel_path)
+        entry = self._dirs.get(rel_path)
+        if entry is None:
+            # not below a catalogued root (or deeper than scanned), list it directly
+            path = os.path.join(self.case_path, rel_path)
+            if not os.path.isdir(path):
+                raise FileNotFoundError(f"Cannot find dir: {path}")
+            entry = _list_dir(path, os.stat(path).st_mtime_ns)
+            self._dirs[rel_path] = entry
+        return entry
+
+    def _scan(self, rel_path: str, depth: int, dirs: dict) -> bool:
+        path = os.path.join(self.case_path, rel_path)
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except OSError:
+            return rel_path in self._dirs
+
+        changed = False
+        entry = self._dirs.get(rel_path)
+        if entry is None or entry["mtime_ns"] != mtime_ns:
+            entry = _list_dir(path, mtime_ns)
+            changed = True
+        elif _is_racy(entry):
+            # the modification time matches but entries may have been added in the same tick
+            listed = _list_dir(path, mtime_ns)
+            changed = listed["dirs"] != entry["dirs"] or listed["files"] != entry["files"]
+            entry = listed
+            self._relisted = True
+        dirs[rel_path] = entry
+
+        if depth > 1:
+            for name in entry["dirs"]:
+                changed |= self._scan(os.path.join(rel_path, name), depth - 1, dirs)
+        return changed
+
+    def _load(self) -> dict:
+        try:
+            with open(self.catalog_path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get("version") != CATALOG_VERSION:
+            return {}
+        return data["dirs"]
+
+    def __str__(self):
+        return f"CaseCatalog: {self.case_path}"
+
+
+def _root_of(rel_path: str) -> str:
+    return rel_path.split(os.sep, 1)[0]
+
+
+def _is_racy(entry: dict) -> bool:
+    return entry["mtime_ns"] >= entry["listed_ns"] - RACY_WINDOW_NS
+
+
+def _list_dir(path: str, mtime_ns: int) -> dict:
+    # taken before listing so anything added during the listing counts as after it
+    listed_ns = time.time_ns()
+    dirs = []
+    files = {}
+    with os.scandir(path) as entries:
+        for entry in entries:
+            try:
+                if entry.is_dir():
+                    dirs.append(entry.name)
+                else:
+                    files[entry.name] = entry.stat().st_size
+            except OSError:
+                continue
+
+    times = []
+    for name in dirs:
+        try:
+            times.append((float(name), name))
+        except ValueError:
+            continue
+
+    return {
+        "mtime_ns": mtime_ns,
+        "listed_ns": listed_ns,
+        "dirs": sorted(dirs),
+        "time_dirs": [name for _, name in sorted(times)],
+        "files": files,
+    }
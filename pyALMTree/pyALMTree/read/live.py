@@ -0,0 +1,286 @@
+import os
+import numpy as np
+import pandas as pd
+from .turbineOutput import BladeDataResult, _blade_result_from_block
+from .postProcessing_probe import (
+    ProbeData,
+    _parse_probe_header_line,
+    _probe_line_shape,
+    _parse_probe_block,
+    _probe_dict_from_arrays,
+    _component_suffixes,
+)
+
+
+class _GrowingArray:
+    """
+    Preallocated (rows, columns) buffer that doubles its capacity when full.
+    """
+
+    def __init__(self, number_of_columns: int, capacity: int = 1024, dtype=np.float64):
+        self._buffer = np.empty((capacity, number_of_columns), dtype=dtype)
+        self._size = 0
+
+    def append(self, rows: np.ndarray):
+        required = self._size + len(rows)
+        if required > len(self._buffer):
+            capacity = max(required, 2 * len(self._buffer))
+            buffer = np.empty((capacity, self._buffer.shape[1]), dtype=self._buffer.dtype)
+            buffer[: self._size] = self._buffer[: self._size]
+            self._buffer = buffer
+        self._buffer[self._size : required] = rows
+        self._size = required
+
+    @property
+    def values(self) -> np.ndarray:
+        return self._buffer[: self._size]
+
+
+class _TailReader:
+    """
+    Remembers the byte offset into a file and hands every newly appended complete line to _consume.
+    """
+
+    def __init__(self, file_path: str, initial_capacity: int = 1024, dtype=np.float64):
+        self.file_path = file_path
+        self.initial_capacity = initial_capacity
+        self.dtype = dtype
+        self._reset()
+
+    def _reset(self):
+        self.offset = 0
+        self._rows = None
+
+    def refresh(self) -> int:
+        """
+        Parse the lines appended to the file since the last refresh. If the file has shrunk (i.e. it
+        has been rewritten) it is read again from the start.
+
+        Returns:
+            int: Number of new rows.
+        """
+        if not os.path.exists(self.file_path):
+            return 0
+        if os.path.getsize(self.file_path) < self.offset:
+            self._reset()
+        previous_rows = self.number_of_rows
+
+        with open(self.file_path, "rb") as f:
+            f.seek(self.offset)
+            data = f.read()
+
+        # only complete lines, a partially written line is picked up by the next refresh
+        end = data.rfind(b"\n") + 1
+        if end == 0:
+            return 0
+
+        consumed = self._consume(data[:end])
+        self.offset += consumed
+        return self.number_of_rows - previous_rows
+
+    @property
+    def number_of_rows(self) -> int:
+        return 0 if self._rows is None else len(self._rows.values)
+
+    def _append(self, block: np.ndarray):
+        if self._rows is None:
+            self._rows = _GrowingArray(block.shape[1], self.initial_capacity, self.dtype)
+        self._rows.append(block)
+
+    def _consume(self, data: bytes) -> int:
+        raise NotImplementedError
+
+
+class LiveTurbineOutputReader(_TailReader):
+    """
+    Incrementally reads a turbineOutput file that is still being written to.
+
+    Each call to refresh() parses only the complete lines appended since the previous call, so polling
+    a running simulation costs time proportional to the new data rather than the size of the file.
+
+    Attributes:
+        file_path (str): Path to the turbineOutput file.
+        headers (list[str]): Column headers (the final header is the blade distribution for blade files).
+        rows (np.ndarray): (rows, columns) array of every row read so far.
+        time (np.ndarray): Time of every row read so far.
+    """
+
+    def __init__(
+        self,
+        file_path: str,
+        blade_data_file: bool = False,
+        initial_capacity: int = 1024,
+        dtype=np.float64,
+    ):
+        """
+        Args:
+            file_path (str): Path to the turbineOutput file.
+            blade_data_file (bool, optional): If True the file contains a blade distribution. Defaults to False.
+            initial_capacity (int, optional): Number of rows to preallocate. Defaults to 1024.
+            dtype (type, optional): dtype of the stored rows. Defaults to np.float64.
+        """
+        self.blade_data_file = blade_data_file
+        super().__init__(file_path, initial_capacity, dtype)
+
+    def _reset(self):
+        super()._reset()
+        self.headers = None
+
+    def _consume(self, data: bytes) -> int:
+        consumed = 0
+        if self.headers is None:
+            header_line, _, data = data.partition(b"\n")
+            consumed += len(header_line) + 1
+            # Split the header by four spaces
+            self.headers = header_line.decode().strip().split("    ")
+
+        if len(data) == 0:
+            return consumed
+
+        number_of_columns = len(data[: data.find(b"\n")].split())
+        block = np.fromstring(data, sep=" ").reshape(-1, number_of_columns)
+        self._append(block)
+        return consumed + len(data)
+
+    @property
+    def rows(self) -> np.ndarray:
+        if self._rows is None:
+            return np.empty((0, 0), dtype=self.dtype)
+        return self._rows.values
+
+    @property
+    def time(self) -> np.ndarray:
+        if self._rows is None:
+            return np.array([], dtype=self.dtype)
+        return self.rows[:, self.headers.index("Time(s)")]
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """
+        Returns:
+            pd.DataFrame: The rows read so far in the same layout as turbineOutput_file.
+        """
+        if not self.blade_data_file:
+            return pd.DataFrame(self.rows.copy(), columns=self.headers)
+
+        number_of_scalars = len(self.headers) - 1
+        df = pd.DataFrame(self.rows[:, :number_of_scalars].copy(), columns=self.headers[:-1])
+        df[self.headers[-1]] = [row for row in self.rows[:, number_of_scalars:].copy()]
+        return df
+
+    def to_blade_result(self, dtype=np.float64, turbine: int = 0) -> BladeDataResult:
+        """
+        Returns:
+            BladeDataResult: The rows read so far in the same layout as turbineOutput_blade_file.
+        """
+        return _blade_result_from_block(self.rows, self.headers, dtype, turbine)
+
+
+class LiveProbeReader(_TailReader):
+    """
+    Incrementally reads a postProcessing probe file that is still being written to.
+
+    Each call to refresh() parses only the complete lines appended since the previous call, so polling
+    a running simulation costs time proportional to the new data rather than the size of the file.
+
+    Attributes:
+        file_path (str): Path to the probe file.
+        probe_indices (list[int]): Index of each probe.
+        coords (np.ndarray): (probes, 3) array of probe locations.
+        time (np.ndarray): Time of every row read so far.
+        values (np.ndarray): (times, probes, components) array of every row read so far.
+    """
+
+    def __init__(
+        self,
+        file_path: str,
+        force_variable_name_to_be: str = "",
+        initial_capacity: int = 1024,
+        dtype=np.float64,
+    ):
+        """
+        Args:
+            file_path (str): Path to the probe file.
+            force_variable_name_to_be (str, optional): Variable name used by to_dict. Defaults to the file name.
+            initial_capacity (int, optional): Number of time steps to preallocate. Defaults to 1024.
+            dtype (type, optional): dtype of the stored values. Defaults to np.float64.
+        """
+        if force_variable_name_to_be != "":
+            self.variable_name = force_variable_name_to_be
+        else:
+            self.variable_name = os.path.basename(file_path)
+        super().__init__(file_path, initial_capacity, dtype)
+
+    def _reset(self):
+        super()._reset()
+        self.probe_indices = []
+        self._coords = []
+        self.number_of_components = None
+        self._number_of_columns = None
+
+    def _consume(self, data: bytes) -> int:
+        consumed = 0
+
+        # the header is complete once the first data line has been written
+        while self._number_of_columns is None:
+            line, newline, rest = data.partition(b"\n")
+            if not newline:
+                return consumed
+            if line.startswith(b"#"):
+                probe = _parse_probe_header_line(line.decode())
+                if probe is not None:
+                    self.probe_indices.append(probe[0])
+                    self._coords.append(probe[1])
+                consumed += len(line) + 1
+                data = rest
+                continue
+            number_of_probes, self.number_of_components = _probe_line_shape(line)
+            self._number_of_columns = 1 + number_of_probes * self.number_of_components
+
+        if len(data) == 0:
+            return consumed
+
+        self._append(_parse_probe_block(data, self._number_of_columns))
+        return consumed + len(data)
+
+    @property
+    def coords(self) -> np.ndarray:
+        return np.array(self._coords, dtype=float).reshape(-1, 3)
+
+    @property
+    def time(self) -> np.ndarray:
+        if self._rows is None:
+            return np.array([], dtype=self.dtype)
+        return self._rows.values[:, 0]
+
+    @property
+    def values(self) -> np.ndarray:
+        if self._rows is None:
+            return np.empty((0, 0, 0), dtype=self.dtype)
+        # the buffer rows are contiguous so this is a view
+        return self._rows.values[:, 1:].reshape(self.number_of_rows, -1, self.number_of_components)
+
+    def to_dict(self) -> dict:
+        """
+        Returns:
+            dict: The rows read so far in the same layout as postProcessing_probe_file.
+        """
+        return _probe_dict_from_arrays(
+            self.time.copy(),
+            self.coords,
+            self.values.copy(),
+            self.variable_name,
+            _component_suffixes(self.number_of_components),
+        )
+
+    def to_probe_data(self) -> ProbeData:
+        """
+        Returns:
+            ProbeData: The rows read so far in the same layout as postProcessing_probe_array.
+        """
+        result = ProbeData()
+        result.variable_name = self.variable_name
+        result.probe_indices = np.array(self.probe_indices, dtype=int)
+        result.coords = self.coords
+        result.time = self.time.copy()
+        result.values = self.values.copy()
+        return result
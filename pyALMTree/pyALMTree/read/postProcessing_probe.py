@@ -2,91 +2,412 @@ import pandas as pd
 import numpy as np
 import os
 import re
+from .cache import cached_read
+from .time_index import read_time_window, window_offsets, narrow_window, window_mask
 
 
-def postProcessing_probe_file(file_path: str, force_variable_name_to_be="") -> pd.DataFrame:
+class ProbeData:
+    def __init__(self):
+        self.variable_name = None
+        self.probe_indices = np.array([], dtype=int)
+        self.coords = np.empty((0, 3))
+        self.time = np.array([])
+        self.values = np.empty((0, 0, 1))
+
+    def to_dict(self) -> dict:
+        """
+        Returns:
+            dict: The dict of dicts layout of postProcessing_probe_file. The value arrays are views of
+                  self.values so no data is copied.
+        """
+        return _probe_dict_from_arrays(
+            self.time,
+            self.coords,
+            self.values,
+            self.variable_name,
+            _component_suffixes(self.values.shape[2]),
+        )
+
+
+def postProcessing_probe_file(
+    file_path: str,
+    force_variable_name_to_be="",
+    use_cache: bool = True,
+    t_min: float = None,
+    t_max: float = None,
+) -> pd.DataFrame:
+    """
+    Read a probe file from the postProcessing directory into a dict of dicts of the form
+    {"time": t, "Probe i": {"x": x, "y": y, "z": z, "<variable>_<component>": values}}.
+
+    This is a view of postProcessing_probe_array.
+
+    Args:
+        file_path (str): Path to file.
+        force_variable_name_to_be (str, optional): Variable name used for the keys. Defaults to the file name.
+        use_cache (bool, optional): Serve the file from the on-disk cache (see pyALMTree.read.cache).
+                                    Defaults to True.
+        t_min (float, optional): Only read times with t_min <= time. Defaults to None.
+        t_max (float, optional): Only read times with time <= t_max. Defaults to None.
+
+    Returns:
+        dict: Probe data.
+    """
+    return postProcessing_probe_array(
+        file_path,
+        force_variable_name_to_be=force_variable_name_to_be,
+        use_cache=use_cache,
+        t_min=t_min,
+        t_max=t_max,
+    ).to_dict()
+
+
+def postProcessing_probe_array(
+    file_path: str,
+    force_variable_name_to_be="",
+    dtype: type = np.float64,
+    use_cache: bool = True,
+    t_min: float = None,
+    t_max: float = None,
+) -> ProbeData:
+    """
+    Read a probe file from the postProcessing directory into dense arrays.
+
+    The header and body are read in a single pass: the parentheses of vector and tensor values are
+    blanked out of the raw buffer and every value is parsed at once into a
+    (n_times, n_probes, n_components) array.
+
+    Args:
+        file_path (str): Path to file.
+        force_variable_name_to_be (str, optional): Variable name stored in the result. Defaults to the file name.
+        dtype (type, optional): dtype of the values array. Defaults to np.float64.
+        use_cache (bool, optional): Serve the file from the on-disk cache (see pyALMTree.read.cache).
+                                    Defaults to True.
+        t_min (float, optional): Only read times with t_min <= time. Defaults to None.
+        t_max (float, optional): Only read times with time <= t_max. Defaults to None.
+
+    Returns:
+        ProbeData: Probe indices, coordinates (n_probes, 3), time (n_times,) and values.
+    """
     if force_variable_name_to_be != "":
         variable_name = force_variable_name_to_be
     else:
         variable_name = os.path.basename(file_path)
-    with open(file_path, "r") as file:
-        lines = file.readlines()
 
-    # first read in the locations of the probes and the delimiter to use
-    probe_indices = []
-    x_coords = []
-    y_coords = []
-    z_coords = []
+    if t_min is not None or t_max is not None:
+        t_min, t_max = narrow_window(file_path, 0, t_min, t_max, use_cache)
 
-    # Regex to extract probe information
-    probe_pattern = re.compile(
-    r"# Probe (\d+) \((-?\d+(?:\.\d+)?) (-?\d+(?:\.\d+)?) (-?\d+(?:\.\d+)?)\)"
-    )
+    # a time window that cuts the file is read straight from it using the sparse time index
+    if t_min is not None or t_max is not None:
+        result = _parse_probe_window(file_path, t_min, t_max, use_cache)
+    else:
+        result = cached_read(
+            file_path,
+            "postProcessing_probe_array",
+            {},
+            lambda: _parse_probe_file(file_path),
+            _pack_probe_data,
+            _unpack_probe_data,
+            use_cache=use_cache,
+        )
+
+    result.variable_name = variable_name
+    result.values = result.values.astype(dtype, copy=False)
+    return result
+
+
+def postProcessing_probe_chunks(
+    file_path: str,
+    chunk_size: int = 100000,
+    force_variable_name_to_be="",
+    dtype: type = np.float64,
+    use_cache: bool = True,
+    t_min: float = None,
+    t_max: float = None,
+):
+    """
+    Stream a probe file from the postProcessing directory in chunks of chunk_size time steps.
+
+    The header is parsed once and the body is read in blocks of roughly chunk_size lines, so the peak
+    memory is set by the chunk size rather than the size of the file. Every chunk shares the same
+    probe_indices and coords arrays.
+
+    Args:
+        file_path (str): Path to file.
+        chunk_size (int, optional): Number of time steps per chunk (the final chunk may be shorter).
+                                    Defaults to 100000.
+        force_variable_name_to_be (str, optional): Variable name stored in the result. Defaults to the file name.
+        dtype (type, optional): dtype of the values arrays. Defaults to np.float64.
+        use_cache (bool, optional): Persist the time index used for t_min/t_max in the cache. Defaults to True.
+        t_min (float, optional): Only read times with t_min <= time. Defaults to None.
+        t_max (float, optional): Only read times with time <= t_max. Defaults to None.
+
+    Yields:
+        ProbeData: The next chunk of time steps.
+    """
+    if force_variable_name_to_be != "":
+        variable_name = force_variable_name_to_be
+    else:
+        variable_name = os.path.basename(file_path)
+
+    with open(file_path, "rb") as file:
+        probe_indices, coords, number_of_probes, number_of_components = _read_probe_header(file)
+        data_start = file.tell()
+        first_line = file.readline()
+    number_of_columns = 1 + number_of_probes * number_of_components
+
+    if t_min is not None or t_max is not None:
+        start, end = window_offsets(file_path, 0, t_min, t_max, use_cache)
+    else:
+        start, end = data_start, os.path.getsize(file_path)
+
+    def make_chunk(block):
+        chunk = _probe_data_from_block(probe_indices, coords, block, number_of_components)
+        chunk.variable_name = variable_name
+        chunk.values = chunk.values.astype(dtype, copy=False)
+        return chunk
+
+    # the lines of a probe file all have roughly the same length
+    block_size = max(len(first_line), 1) * chunk_size
+    pending = []
+    number_pending = 0
+    remainder = b""
+    with open(file_path, "rb") as file:
+        file.seek(start)
+        position = start
+        while position < end:
+            data = file.read(min(block_size, end - position))
+            if len(data) == 0:
+                break
+            position += len(data)
+
+            # only parse complete lines, the rest is carried into the next block
+            data = remainder + data
+            cut = data.rfind(b"\n") + 1
+            remainder = data[cut:]
+            block = _parse_probe_block(data[:cut], number_of_columns)
+            block = block[window_mask(block[:, 0], t_min, t_max)]
+            pending.append(block)
+            number_pending += len(block)
+
+            while number_pending >= chunk_size:
+                block = np.concatenate(pending) if len(pending) > 1 else pending[0]
+                yield make_chunk(block[:chunk_size])
+                pending = [block[chunk_size:]]
+                number_pending -= chunk_size
+
+    if number_pending > 0:
+        yield make_chunk(np.concatenate(pending))
+
+
+def postProcessing_probe_memmap(
+    file_path: str,
+    memmap_path: str,
+    chunk_size: int = 100000,
+    force_variable_name_to_be="",
+    dtype: type = np.float64,
+    use_cache: bool = True,
+    t_min: float = None,
+    t_max: float = None,
+) -> ProbeData:
+    """
+    Stream a probe file from the postProcessing directory into an np.memmap so that files larger than
+    the available memory can be analysed out-of-core.
+
+    The values are written chunk by chunk (see postProcessing_probe_chunks) to memmap_path as a raw
+    (n_times, n_probes, n_components) array, only the time array is held in memory.
+
+    Args:
+        file_path (str): Path to file.
+        memmap_path (str): Path of the raw array file to write (overwritten if it exists).
+        chunk_size (int, optional): Number of time steps read at a time. Defaults to 100000.
+        force_variable_name_to_be (str, optional): Variable name stored in the result. Defaults to the file name.
+        dtype (type, optional): dtype of the memmap. Defaults to np.float64.
+        use_cache (bool, optional): Persist the time index used for t_min/t_max in the cache. Defaults to True.
+        t_min (float, optional): Only read times with t_min <= time. Defaults to None.
+        t_max (float, optional): Only read times with time <= t_max. Defaults to None.
 
+    Returns:
+        ProbeData: Result whose values attribute is an np.memmap opened in "r+" mode.
+    """
+    result = ProbeData()
+    times = []
+    with open(memmap_path, "wb") as f:
+        for chunk in postProcessing_probe_chunks(
+            file_path,
+            chunk_size=chunk_size,
+            force_variable_name_to_be=force_variable_name_to_be,
+            dtype=dtype,
+            use_cache=use_cache,
+            t_min=t_min,
+            t_max=t_max,
+        ):
+            np.ascontiguousarray(chunk.values).tofile(f)
+            times.append(chunk.time)
+            result = chunk
 
-    # Parse each line
-    with open(file_path, "r") as file:
-        for line in file:
-            if not line.startswith("#"):
-                if "(" not in line:
-                    delimiter = r"\s+"
-                    file_type = "scalar"
-                else:
-                    delimiter = r" {16}"
-                    file_type = "vector/tensor"
-                break  # Stop processing further lines
-            if "Time" in line:
-                continue
-            if "# Not Found" in line:
-                continue
-            if "(" not in line:
-                # find the delimiter
-                continue
-
-            match = probe_pattern.match(line)
-            if match:
-                probe_indices.append(int(match.group(1)))
-                x_coords.append(float(match.group(2)))
-                y_coords.append(float(match.group(3)))
-                z_coords.append(float(match.group(4)))
-
-    df = pd.read_csv(file_path, comment="#", delimiter=delimiter, engine='python')
-    number_of_columns = len(df.columns) - 1
-    headers = ["time"]
-    for i in range(number_of_columns):
-        headers.append(f"Probe {i}")
-
-    df.columns = headers
-
-    x_coords = np.array(x_coords)
-    y_coords = np.array(y_coords)
-    z_coords = np.array(z_coords)
-
-    for column in df.keys():
-        if column == "time":
-            continue
-        if file_type == "vector/tensor":
-            df[column] = df[column].apply(lambda x: x.strip("(").strip(")").split(" "))
-
-    processed_dict = {"time": df["time"].to_numpy()}
-    for column in df.keys():
-        if column == "time":
-            continue
-        probe_ind = int(column.strip("Probe").strip(" "))
+    if len(times) == 0:
+        # np.memmap cannot map an empty file, return an empty result that still describes the probes
+        with open(file_path, "rb") as file:
+            probe_indices, coords, number_of_probes, number_of_components = _read_probe_header(file)
+        result = _probe_data_from_block(
+            probe_indices, coords, np.empty((0, 1 + number_of_probes * number_of_components)), number_of_components
+        )
+        result.variable_name = force_variable_name_to_be or os.path.basename(file_path)
+        result.values = result.values.astype(dtype)
+        return result
+
+    shape = (sum(len(time) for time in times),) + result.values.shape[1:]
+    result.time = np.concatenate(times)
+    result.values = np.memmap(memmap_path, dtype=dtype, mode="r+", shape=shape)
+    return result
+
+
+def _pack_probe_data(result: ProbeData):
+    arrays = {
+        "probe_indices": result.probe_indices,
+        "coords": result.coords,
+        "time": result.time,
+        "values": result.values,
+    }
+    return arrays, {}
+
+
+def _unpack_probe_data(arrays, meta) -> ProbeData:
+    result = ProbeData()
+    result.probe_indices = arrays["probe_indices"]
+    result.coords = arrays["coords"]
+    result.time = arrays["time"]
+    result.values = arrays["values"]
+    return result
+
+
+def _probe_dict_from_arrays(time, coords, values, variable_name, suffixes, probe_names=None):
+    # build the dict of dicts output from (time,), (probe, 3) and (time, probe, component) arrays
+    if probe_names is None:
+        probe_names = [f"Probe {i}" for i in range(values.shape[1])]
+
+    processed_dict = {"time": time}
+    for probe_ind, name in enumerate(probe_names):
         probe_dict = {
-            "x": x_coords[probe_ind],
-            "y": y_coords[probe_ind],
-            "z": z_coords[probe_ind],
+            "x": coords[probe_ind, 0],
+            "y": coords[probe_ind, 1],
+            "z": coords[probe_ind, 2],
         }
-        
-        if file_type == "vector/tensor":
-            n = len(df[column][0])
-            arrays_by_index = [np.array(df[column].apply(lambda x: x[i]), dtype=float) for i in range(n)]
-            for i in range(n):
-                probe_dict[f"{variable_name}_{i}"] = arrays_by_index[i]
-        else:
-            probe_dict[f"{variable_name}"] = df[column]
-        
-        processed_dict[column] = probe_dict
-
+        for component_ind, suffix in enumerate(suffixes):
+            probe_dict[f"{variable_name}{suffix}"] = values[:, probe_ind, component_ind]
+        processed_dict[name] = probe_dict
     return processed_dict
+
+
+_PROBE_PATTERN = re.compile(r"#\s*Probe\s+(\d+)\s*\(([^)]*)\)")
+_PARENTHESES = bytes.maketrans(b"()", b"  ")
+
+
+def _parse_probe_header_line(line: str):
+    """
+    Returns (probe index, (x, y, z)) if the line defines a probe location otherwise None.
+    """
+    match = _PROBE_PATTERN.match(line)
+    if match is None:
+        return None
+    return int(match.group(1)), tuple(float(value) for value in match.group(2).split())
+
+
+def _probe_line_shape(line: bytes):
+    """
+    Returns (number of probes, number of components) of a single data line.
+    """
+    if b"(" not in line:
+        return len(line.split()) - 1, 1
+    groups = line.split(b"(")[1:]
+    return len(groups), len(groups[0].split(b")")[0].split())
+
+
+def _parse_probe_block(data: bytes, number_of_columns: int) -> np.ndarray:
+    """
+    Parse complete data lines of a probe file into a (rows, 1 + probes * components) array by
+    blanking the parentheses and reading every value in one pass.
+    """
+    if len(data) == 0:
+        return np.empty((0, number_of_columns))
+    values = np.fromstring(data.translate(_PARENTHESES), sep=" ")
+    return values.reshape(-1, number_of_columns)
+
+
+def _read_probe_header(file):
+    """
+    Read the header of a probe file opened in binary mode, leaving the file at the start of the data.
+
+    Returns:
+        (probe indices, (probes, 3) coordinates, number of probes, number of components) where the
+        number of probes and components come from the first data line.
+    """
+    probe_indices = []
+    coords = []
+    while True:
+        offset = file.tell()
+        line = file.readline()
+        if not line.startswith(b"#"):
+            break
+        probe = _parse_probe_header_line(line.decode())
+        if probe is not None:
+            probe_indices.append(probe[0])
+            coords.append(probe[1])
+    file.seek(offset)
+
+    if line.endswith(b"\n"):
+        number_of_probes, number_of_components = _probe_line_shape(line)
+    else:
+        number_of_probes, number_of_components = len(coords), 1
+    return (
+        np.array(probe_indices, dtype=int),
+        np.array(coords, dtype=float).reshape(-1, 3),
+        number_of_probes,
+        number_of_components,
+    )
+
+
+def _component_suffixes(number_of_components: int) -> list[str]:
+    if number_of_components == 1:
+        return [""]
+    return [f"_{i}" for i in range(number_of_components)]
+
+
+def _probe_data_from_block(probe_indices, coords, block, number_of_components) -> ProbeData:
+    # split a (rows, 1 + probes * components) block into a ProbeData
+    number_of_probes = (block.shape[1] - 1) // number_of_components
+    if len(coords) != number_of_probes:
+        raise ValueError(
+            f"The header defines {len(coords)} probes but the data contains {number_of_probes}"
+        )
+
+    result = ProbeData()
+    result.probe_indices = probe_indices
+    result.coords = coords
+    result.time = np.ascontiguousarray(block[:, 0])
+    result.values = np.ascontiguousarray(block[:, 1:]).reshape(
+        len(block), number_of_probes, number_of_components
+    )
+    return result
+
+
+def _parse_probe_file(file_path: str) -> ProbeData:
+    with open(file_path, "rb") as file:
+        probe_indices, coords, number_of_probes, number_of_components = _read_probe_header(file)
+        data = file.read()
+
+    # ignore a partially written final line
+    data = data[: data.rfind(b"\n") + 1]
+    block = _parse_probe_block(data, 1 + number_of_probes * number_of_components)
+    return _probe_data_from_block(probe_indices, coords, block, number_of_components)
+
+
+def _parse_probe_window(file_path, t_min, t_max, use_cache) -> ProbeData:
+    with open(file_path, "rb") as file:
+        probe_indices, coords, number_of_probes, number_of_components = _read_probe_header(file)
+
+    data = read_time_window(file_path, 0, t_min, t_max, use_cache)
+    block = _parse_probe_block(data, 1 + number_of_probes * number_of_components)
+    block = block[window_mask(block[:, 0], t_min, t_max)]
+    return _probe_data_from_block(probe_indices, coords, block, number_of_components)
@@ -1,16 +1,144 @@
+import os
 import pandas as pd
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+from .cache import cached_read, pack_dataframe, unpack_dataframe
+from .restarts import time_dirs
 
-def postProcessing_sample_file(file_path: str) -> pd.DataFrame:
+# columns of a sample file that hold the sample locations rather than sampled values
+COORDINATE_COLUMNS = ["x", "y", "z", "distance"]
+
+
+class SampleSeries:
+    def __init__(self):
+        self.file_name = None
+        self.time = np.array([])
+        self.coord_names = []
+        self.coords = np.empty((0, 0))
+        self.variables = []
+        self.values = np.empty((0, 0, 0))
+
+    def to_dataframe(self, time_ind: int) -> pd.DataFrame:
+        """
+        Args:
+            time_ind (int): Index of the time to return.
+
+        Returns:
+            pd.DataFrame: The sample at a single time in the layout of postProcessing_sample_file.
+        """
+        data = {name: self.coords[:, i] for i, name in enumerate(self.coord_names)}
+        for i, name in enumerate(self.variables):
+            data[name] = self.values[time_ind, :, i]
+        return pd.DataFrame(data)
+
+
+def postProcessing_sample_file(file_path: str, use_cache: bool = True) -> pd.DataFrame:
     """
     Read in a sample file from the postProcessing directory and return it as a pandas DataFrame. 
     
     Args:
         file_path (str): Path to file.
+        use_cache (bool, optional): Serve the file from the on-disk cache (see pyALMTree.read.cache).
+                                    Defaults to True.
 
     Returns:
         pd.DataFrame: Dataframe containing file contents.
     """
-    df = pd.read_csv(file_path)
+    df = cached_read(
+        file_path,
+        "postProcessing_sample_file",
+        {},
+        lambda: pd.read_csv(file_path),
+        pack_dataframe,
+        unpack_dataframe,
+        use_cache=use_cache,
+    )
     return df
-    
\ No newline at end of file
+
+
+def postProcessing_sample_series(
+    sample_dir_path: str,
+    file_name: str,
+    variables: List[str] = None,
+    t_min: float = None,
+    t_max: float = None,
+    stride: int = 1,
+    dtype: type = np.float64,
+    n_workers: int = None,
+    use_cache: bool = True,
+    time_dir_names: List[str] = None,
+) -> SampleSeries:
+    """
+    Read a sample file from every time directory of a sample function object into a single
+    (time, point, variable) array.
+
+    The time directories are listed and sorted once, and the selected files are read concurrently by a
+    pool of threads which write straight into the preallocated output array.
+
+    Args:
+        sample_dir_path (str): Path to the sample function object, e.g. case/postProcessing/sample.
+        file_name (str): Name of the sample file within each time directory.
+        variables (List[str], optional): Columns to read. Defaults to None (every non coordinate column).
+        t_min (float, optional): Only read times with t_min <= time. Defaults to None.
+        t_max (float, optional): Only read times with time <= t_max. Defaults to None.
+        stride (int, optional): Read every stride-th time directory within the window. Defaults to 1.
+        dtype (type, optional): dtype of the values array. Defaults to np.float64.
+        n_workers (int, optional): Number of reader threads. Defaults to the executor default.
+        use_cache (bool, optional): Serve the files from the on-disk cache (see pyALMTree.read.cache).
+                                    Defaults to True.
+        time_dir_names (List[str], optional): Numerically sorted names of the time directories that
+                                              contain file_name, e.g. from a CaseCatalog. Defaults to
+                                              None (list sample_dir_path).
+
+    Raises:
+        FileNotFoundError: If no time directory in the window contains file_name.
+        ValueError: If the sample points differ between time directories.
+
+    Returns:
+        SampleSeries: time (n_times,), coords (n_points, n_coords) and values (n_times, n_points, n_variables).
+    """
+    check_exists = time_dir_names is None
+    if check_exists:
+        time_dir_names = time_dirs(sample_dir_path)
+
+    selected = []
+    for time_dir in time_dir_names:
+        time = float(time_dir)
+        if t_min is not None and time < t_min:
+            continue
+        if t_max is not None and time > t_max:
+            continue
+        file_path = os.path.join(sample_dir_path, time_dir, file_name)
+        if not check_exists or os.path.exists(file_path):
+            selected.append((time, file_path))
+    selected = selected[::stride]
+
+    if len(selected) == 0:
+        raise FileNotFoundError(f"{file_name} cannot be found in {sample_dir_path}")
+
+    # the first file sets the layout of the output
+    first = postProcessing_sample_file(selected[0][1], use_cache=use_cache)
+    result = SampleSeries()
+    result.file_name = file_name
+    result.time = np.array([time for time, _ in selected])
+    result.coord_names = [column for column in first.columns if column in COORDINATE_COLUMNS]
+    if variables is None:
+        variables = [column for column in first.columns if column not in COORDINATE_COLUMNS]
+    result.variables = list(variables)
+    result.coords = first[result.coord_names].to_numpy(dtype=float)
+    result.values = np.empty((len(selected), len(first), len(result.variables)), dtype=dtype)
+
+    def read(time_ind):
+        df = first if time_ind == 0 else postProcessing_sample_file(selected[time_ind][1], use_cache=use_cache)
+        if len(df) != result.values.shape[1]:
+            raise ValueError(
+                f"{selected[time_ind][1]} has {len(df)} points rather than {result.values.shape[1]}"
+            )
+        result.values[time_ind] = df[result.variables].to_numpy()
+
+    with ThreadPoolExecutor(max_workers=n_workers) as executor:
+        # list() so that any exception raised by a reader is propagated
+        list(executor.map(read, range(len(selected))))
+
+    return result
@@ -0,0 +1,247 @@
+import os
+import re
+import numpy as np
+import pandas as pd
+
+# surface writer formats that can be read, by file extension
+SURFACE_FORMATS = {".raw": "raw", ".vtk": "vtk"}
+
+# lines of a legacy VTK file that are keywords or names rather than numeric data
+_VTK_KEYWORD_LINE = re.compile(rb"^[^\d\s+\-.].*$", re.M)
+
+_VTK_DATA_KEYWORDS = (b"CELL_DATA", b"POINT_DATA")
+
+
+class SurfaceData:
+    def __init__(self):
+        self.file_format = None
+        self.location = None
+        self.n_values = 0
+        self.points = np.empty((0, 3))
+        self.faces = np.array([], dtype=np.int64)
+        self.field_names = []
+        self.fields = {}
+        # raw only: the column name of each component of a field, e.g. {"U": ["U_x", "U_y", "U_z"]}
+        self.component_names = {}
+        # vtk only: the file up to the field data, so it can be reused and written back verbatim
+        self.geometry_block = b""
+        self.data_offset = None
+
+
+def postProcessing_surface_file(file_path: str, geometry: SurfaceData = None) -> SurfaceData:
+    """
+    Read a surface written by the OpenFOAM surfaces function object in the raw (<field>_<surface>.raw)
+    or legacy ASCII VTK (<surface>.vtk) format.
+
+    The geometry of a surface does not change between time directories, so the result of a previous
+    read can be passed as geometry. Only the field values are then parsed (for VTK files only the part
+    of the file after the geometry is read) and the geometry arrays are shared with it.
+
+    Args:
+        file_path (str): Path to file.
+        geometry (SurfaceData, optional): Surface read from another time of the same surface.
+                                          Defaults to None.
+
+    Raises:
+        ValueError: If the format is not supported or the file does not match geometry.
+
+    Returns:
+        SurfaceData: points ((n_points, 3) face centres or points for raw files), faces (VTK POLYGONS
+                     connectivity), location ("face" or "point"), n_values (number of faces or points)
+                     and fields {name: (n_values, n_components)}.
+    """
+    file_format = SURFACE_FORMATS.get(os.path.splitext(file_path)[1])
+    if file_format == "raw":
+        return _read_raw(file_path, geometry)
+    if file_format == "vtk":
+        return _read_vtk(file_path, geometry)
+    raise ValueError(
+        f"Cannot read {file_path}, surface formats supported are {list(SURFACE_FORMATS.values())}"
+    )
+
+
+def surface_layout(geometry: SurfaceData) -> SurfaceData:
+    """
+    The part of a surface needed to read the field values of another time of it with
+    postProcessing_surface_file, without the points, faces or VTK geometry block. It is much smaller to
+    send to another process than the full geometry.
+
+    Args:
+        geometry (SurfaceData): Surface read from a time of the surface.
+
+    Returns:
+        SurfaceData: file_format, location, n_values, data_offset and component_names of geometry.
+    """
+    layout = SurfaceData()
+    layout.file_format = geometry.file_format
+    layout.location = geometry.location
+    layout.n_values = geometry.n_values
+    layout.data_offset = geometry.data_offset
+    layout.component_names = geometry.component_names
+    return layout
+
+
+def write_surface_file(file_path: str, geometry: SurfaceData, fields: dict):
+    """
+    Write fields on the geometry of a surface in the format it was read in (see
+    postProcessing_surface_file).
+
+    Args:
+        file_path (str): Path to file.
+        geometry (SurfaceData): Surface providing the format, location and geometry.
+        fields (dict): {name: array} with one row (or value) per face or point.
+    """
+    n = geometry.n_values
+    fields = {name: np.asarray(values).reshape(n, -1) for name, values in fields.items()}
+
+    if geometry.file_format == "raw":
+        columns = ["x", "y", "z"]
+        for name, values in fields.items():
+            # keep the component names of the source (e.g. U_x) where the field came from it
+            component_names = geometry.component_names.get(name, [])
+            if len(component_names) == values.shape[1]:
+                columns += component_names
+            elif values.shape[1] == 1:
+                columns.append(name)
+            else:
+                columns += [f"{name}_{i}" for i in range(values.shape[1])]
+
+        with open(file_path, "w") as f:
+            location = "FACE_DATA" if geometry.location == "face" else "POINT_DATA"
+            f.write(f"#  {'  '.join(fields.keys())}  {location}  {n}\n")
+            f.write("#  " + "  ".join(columns) + "\n")
+            _write_rows(f, np.hstack([geometry.points] + list(fields.values())))
+    else:
+        with open(file_path, "wb") as f:
+            f.write(geometry.geometry_block)
+            location = "CELL_DATA" if geometry.location == "face" else "POINT_DATA"
+            f.write(f"{location} {n}\nFIELD attributes {len(fields)}\n".encode())
+            for name, values in fields.items():
+                f.write(f"{name} {values.shape[1]} {n} float\n".encode())
+                _write_rows(f, values)
+
+
+def _write_rows(f, values: np.ndarray):
+    pd.DataFrame(values).to_csv(f, sep=" ", header=False, index=False, float_format="%.12g")
+
+
+def _read_raw(file_path: str, geometry: SurfaceData = None) -> SurfaceData:
+    with open(file_path, "r") as f:
+        names_line = f.readline().lstrip("#").split()
+        columns = f.readline().lstrip("#").split()[3:]
+
+    # "#  <field>  FACE_DATA  <n>" then "#  x  y  z  <components>"
+    location_ind = next(
+        i for i, word in enumerate(names_line) if word in ("FACE_DATA", "POINT_DATA")
+    )
+    field_names = names_line[:location_ind]
+    n = int(names_line[location_ind + 1])
+
+    # the coordinates are in every file but only parsed once
+    usecols = list(range(3 + len(columns))) if geometry is None else list(range(3, 3 + len(columns)))
+    block = pd.read_csv(
+        file_path, sep=r"\s+", comment="#", header=None, usecols=usecols, dtype=np.float64
+    ).to_numpy()
+    if len(block) != n:
+        raise ValueError(f"{file_path} has {len(block)} rows rather than {n}")
+
+    result = SurfaceData()
+    result.file_format = "raw"
+    result.location = "face" if names_line[location_ind] == "FACE_DATA" else "point"
+    result.n_values = n
+    if geometry is None:
+        result.points = np.ascontiguousarray(block[:, :3])
+        block = block[:, 3:]
+    else:
+        if geometry.n_values != n:
+            raise ValueError(f"{file_path} has {n} rows but the geometry has {geometry.n_values}")
+        result.points = geometry.points
+
+    result.field_names = field_names
+    for name in field_names:
+        components = [
+            i for i, column in enumerate(columns) if column == name or column.startswith(name + "_")
+        ]
+        result.fields[name] = np.ascontiguousarray(block[:, components])
+        result.component_names[name] = [columns[i] for i in components]
+    return result
+
+
+def _read_vtk(file_path: str, geometry: SurfaceData = None) -> SurfaceData:
+    with open(file_path, "rb") as f:
+        if geometry is not None:
+            # skip straight to the field data if it is where it was in the geometry file
+            f.seek(geometry.data_offset)
+            data = f.read()
+            if data.startswith(_VTK_DATA_KEYWORDS):
+                return _parse_vtk(data, geometry, geometry.data_offset)
+            f.seek(0)
+        data = f.read()
+
+    return _parse_vtk(data, geometry, 0)
+
+
+def _parse_vtk(data: bytes, geometry: SurfaceData, offset: int) -> SurfaceData:
+    result = SurfaceData()
+    result.file_format = "vtk"
+
+    lines = [(match.start(), match.end(), match.group()) for match in _VTK_KEYWORD_LINE.finditer(data)]
+
+    def block(k):
+        end = lines[k + 1][0] if k + 1 < len(lines) else len(data)
+        return data[lines[k][1] : end]
+
+    k = 0
+    while k < len(lines):
+        words = lines[k][2].split()
+        key = words[0]
+        if key == b"BINARY":
+            raise ValueError("Binary VTK surfaces are not supported, use the ascii format")
+        elif key == b"POINTS" and geometry is None:
+            result.points = np.fromstring(block(k), sep=" ").reshape(-1, 3)
+        elif key == b"POLYGONS" and geometry is None:
+            result.faces = np.fromstring(block(k), dtype=np.int64, sep=" ")
+        elif key in _VTK_DATA_KEYWORDS:
+            if result.location is not None:
+                # only the first data section (the one written by OpenFOAM) is read
+                break
+            result.location = "face" if key == b"CELL_DATA" else "point"
+            result.n_values = int(words[1])
+            result.data_offset = offset + lines[k][0]
+        elif key == b"FIELD" and result.location is not None:
+            # FIELD attributes <n> followed by "<name> <components> <tuples> <type>" arrays
+            for i in range(1, int(words[2]) + 1):
+                name, components, tuples = lines[k + i][2].split()[:3]
+                result.fields[name.decode()] = np.fromstring(block(k + i), sep=" ").reshape(
+                    int(tuples), int(components)
+                )
+            k += int(words[2])
+        elif key == b"SCALARS" and result.location is not None:
+            # SCALARS <name> <type> [<components>] then LOOKUP_TABLE
+            components = int(words[3]) if len(words) > 3 else 1
+            k += 1
+            result.fields[words[1].decode()] = np.fromstring(block(k), sep=" ").reshape(-1, components)
+        elif key in (b"VECTORS", b"NORMALS") and result.location is not None:
+            result.fields[words[1].decode()] = np.fromstring(block(k), sep=" ").reshape(-1, 3)
+        k += 1
+
+    if result.location is None:
+        raise ValueError("No CELL_DATA or POINT_DATA in the VTK surface")
+    result.field_names = list(result.fields.keys())
+
+    for name, values in result.fields.items():
+        if len(values) != result.n_values:
+            raise ValueError(f"{name} has {len(values)} values rather than {result.n_values}")
+
+    if geometry is None:
+        result.geometry_block = data[: result.data_offset]
+    else:
+        if geometry.n_values != result.n_values:
+            raise ValueError(
+                f"The surface has {result.n_values} values but the geometry has {geometry.n_values}"
+            )
+        result.points = geometry.points
+        result.faces = geometry.faces
+        result.geometry_block = geometry.geometry_block
+        result.data_offset = geometry.data_offset
+    return result
@@ -0,0 +1,127 @@
+import os
+import numpy as np
+import pandas as pd
+from typing import List, Tuple
+from .time_index import time_index
+from .turbineOutput import BladeDataResult
+
+
+def time_dirs(path: str) -> List[str]:
+    """
+    Names of the time directories inside path sorted numerically (entries that are not a time are ignored).
+
+    Args:
+        path (str): Directory to search, e.g. case/turbineOutput or case/postProcessing/probes.
+
+    Returns:
+        List[str]: Sorted time directory names.
+    """
+    times = []
+    for name in os.listdir(path):
+        try:
+            time = float(name)
+        except ValueError:
+            continue
+        if os.path.isdir(os.path.join(path, name)):
+            times.append((time, name))
+    return [name for _, name in sorted(times)]
+
+
+def plan_segments(
+    file_paths: List[str],
+    time_column: int,
+    t_min: float = None,
+    t_max: float = None,
+) -> List[Tuple[str, float]]:
+    """
+    Work out which restart segments of a file are needed to build one monotonic time series.
+
+    The segments are given in restart order. Where segments overlap the later one wins, so rows of a
+    segment are only kept if they are earlier than the first time of every later segment (the cutoff).
+    Segments that cannot contribute a row inside [t_min, t_max] are not returned, so they are never read.
+    The first time of each segment comes from the sparse time index so this only touches a few bytes.
+
+    Args:
+        file_paths (List[str]): Path of the file in each restart directory, in restart order.
+        time_column (int): Index of the time column in a data line.
+        t_min (float, optional): Lower time limit. Defaults to None.
+        t_max (float, optional): Upper time limit. Defaults to None.
+
+    Returns:
+        List[Tuple[str, float]]: (file path, cutoff time) of every segment to read.
+    """
+    first_times = []
+    for file_path in file_paths:
+        offsets, times = time_index(file_path, time_column)
+        first_times.append(times[0] if len(times) > 0 else np.inf)
+
+    plan = []
+    cutoff = np.inf
+    for file_path, first_time in reversed(list(zip(file_paths, first_times))):
+        needed = first_time < cutoff
+        if t_max is not None and first_time > t_max:
+            needed = False
+        if t_min is not None and cutoff <= t_min:
+            needed = False
+        if needed:
+            plan.append((file_path, cutoff))
+        cutoff = min(cutoff, first_time)
+
+    # nothing overlaps the window, read the final segment so the caller still gets an empty result
+    if len(plan) == 0:
+        plan.append((file_paths[-1], np.inf))
+
+    return plan[::-1]
+
+
+def stitch_dataframes(dfs: List[pd.DataFrame], cutoffs: List[float], time_key: str) -> pd.DataFrame:
+    """
+    Concatenate the rows of each segment DataFrame that are earlier than its cutoff.
+    """
+    parts = [df[df[time_key] < cutoff] for df, cutoff in zip(dfs, cutoffs)]
+    return pd.concat(parts, ignore_index=True)
+
+
+def stitch_blade_results(results: List[BladeDataResult], cutoffs: List[float]) -> BladeDataResult:
+    """
+    Concatenate the time steps of each segment BladeDataResult that are earlier than its cutoff.
+    """
+    stitched = BladeDataResult()
+    stitched.key = results[0].key
+    masks = [result.time < cutoff for result, cutoff in zip(results, cutoffs)]
+    time_key = results[0].scalars.columns[2]
+    stitched.scalars = stitch_dataframes([result.scalars for result in results], cutoffs, time_key)
+    stitched.time = np.concatenate([result.time[mask] for result, mask in zip(results, masks)])
+    stitched.dt = np.concatenate([result.dt[mask] for result, mask in zip(results, masks)])
+    stitched.blades = results[0].blades
+    stitched.values = np.concatenate([result.values[mask] for result, mask in zip(results, masks)])
+    return stitched
+
+
+def stitch_probe_dicts(probe_dicts: List[dict], cutoffs: List[float]) -> dict:
+    """
+    Concatenate the time steps of each segment probe dict (see postProcessing_probe_file) that are
+    earlier than its cutoff. The probes are assumed not to move between restarts.
+    """
+    masks = [np.asarray(probe_dict["time"]) < cutoff for probe_dict, cutoff in zip(probe_dicts, cutoffs)]
+    stitched = {
+        "time": np.concatenate(
+            [np.asarray(probe_dict["time"])[mask] for probe_dict, mask in zip(probe_dicts, masks)]
+        )
+    }
+    for probe_key, probe_dict in probe_dicts[0].items():
+        if probe_key == "time":
+            continue
+        stitched_probe = {}
+        for value_key, value in probe_dict.items():
+            if value_key in ["x", "y", "z"]:
+                stitched_probe[value_key] = value
+                continue
+            stitched_probe[value_key] = np.concatenate(
+                [
+                    np.asarray(segment[probe_key][value_key])[mask]
+                    for segment, mask in zip(probe_dicts, masks)
+                ]
+            )
+        stitched[probe_key] = stitched_probe
+    return stitched
@@ -0,0 +1,217 @@
+import os
+import numpy as np
+from typing import Tuple
+from .cache import cached_read
+
+# distance in bytes between two entries of the sparse index
+INDEX_STRIDE = 1024**2
+
+
+def build_time_index(
+    file_path: str, time_column: int, stride: int = INDEX_STRIDE
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Build a sparse index of (byte offset, time) pairs for a file whose data lines start after a block
+    of header lines beginning with '#' (probe files) or a single header line (turbineOutput files).
+
+    Rather than reading the whole file, the index seeks to every stride bytes and records the offset and
+    time of the first complete data line after it. The first entry is always the first data line.
+
+    Args:
+        file_path (str): Path to the file.
+        time_column (int): Index of the time column in a data line.
+        stride (int, optional): Distance in bytes between index entries. Defaults to INDEX_STRIDE.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Byte offsets and the times of the lines starting at those offsets.
+    """
+    size = os.path.getsize(file_path)
+    offsets = []
+    times = []
+
+    with open(file_path, "rb") as f:
+        # skip the header
+        first_line = True
+        while True:
+            offset = f.tell()
+            line = f.readline()
+            if not line.endswith(b"\n"):
+                return np.array(offsets, dtype=np.int64), np.array(times)
+            if not (line.startswith(b"#") or (first_line and b"Time" in line)):
+                break
+            first_line = False
+        offsets.append(offset)
+        times.append(_line_time(line, time_column))
+
+        position = offset + stride
+        while position < size:
+            f.seek(position)
+            # discard the partial line we landed in
+            f.readline()
+            offset = f.tell()
+            line = f.readline()
+            if not line.endswith(b"\n"):
+                break
+            offsets.append(offset)
+            times.append(_line_time(line, time_column))
+            position = offset + stride
+
+    return np.array(offsets, dtype=np.int64), np.array(times)
+
+
+def time_index(file_path: str, time_column: int, use_cache: bool = True):
+    """
+    Sparse (byte offset, time) index of a file, persisted through pyALMTree.read.cache so it is only
+    rebuilt when the file changes.
+    """
+    return cached_read(
+        file_path,
+        "time_index",
+        {"time_column": time_column, "stride": INDEX_STRIDE},
+        lambda: build_time_index(file_path, time_column, INDEX_STRIDE),
+        lambda index: ({"offsets": index[0], "times": index[1]}, {}),
+        lambda arrays, meta: (arrays["offsets"], arrays["times"]),
+        use_cache=use_cache,
+    )
+
+
+def window_offsets(
+    file_path: str,
+    time_column: int,
+    t_min: float = None,
+    t_max: float = None,
+    use_cache: bool = True,
+) -> Tuple[int, int]:
+    """
+    Byte range of a file that contains every data line with a time between t_min and t_max.
+
+    The sparse index is used to find the last indexed line before t_min and the first indexed line
+    after t_max, so the range may contain a few lines outside the window which the caller should mask
+    off. Times are assumed to be non-decreasing within the file.
+
+    Args:
+        file_path (str): Path to the file.
+        time_column (int): Index of the time column in a data line.
+        t_min (float, optional): Lower time limit. Defaults to None (start of the file).
+        t_max (float, optional): Upper time limit. Defaults to None (end of the file).
+        use_cache (bool, optional): Persist the index in the cache. Defaults to True.
+
+    Returns:
+        Tuple[int, int]: Start and end byte offsets (equal if the file has no data lines).
+    """
+    offsets, times = time_index(file_path, time_column, use_cache=use_cache)
+    if len(offsets) == 0:
+        return 0, 0
+
+    start = offsets[0]
+    if t_min is not None:
+        ind = np.searchsorted(times, t_min, side="left") - 1
+        if ind > 0:
+            start = offsets[ind]
+
+    end = os.path.getsize(file_path)
+    if t_max is not None:
+        ind = np.searchsorted(times, t_max, side="right")
+        if ind < len(offsets):
+            end = offsets[ind]
+
+    return int(start), int(max(end, start))
+
+
+def read_time_window(
+    file_path: str,
+    time_column: int,
+    t_min: float = None,
+    t_max: float = None,
+    use_cache: bool = True,
+) -> bytes:
+    """
+    Read the complete data lines of a file that can contain times between t_min and t_max (see
+    window_offsets), the caller should mask off the few lines that fall outside the window.
+
+    Args:
+        file_path (str): Path to the file.
+        time_column (int): Index of the time column in a data line.
+        t_min (float, optional): Lower time limit. Defaults to None (start of the file).
+        t_max (float, optional): Upper time limit. Defaults to None (end of the file).
+        use_cache (bool, optional): Persist the index in the cache. Defaults to True.
+
+    Returns:
+        bytes: The data lines.
+    """
+    start, end = window_offsets(file_path, time_column, t_min, t_max, use_cache)
+    if start == end:
+        return b""
+
+    with open(file_path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+
+    # drop a partially written final line
+    return data[: data.rfind(b"\n") + 1]
+
+
+def narrow_window(
+    file_path: str,
+    time_column: int,
+    t_min: float = None,
+    t_max: float = None,
+    use_cache: bool = True,
+) -> Tuple[float, float]:
+    """
+    Drop the limits of a time window that do not cut the file, so that a window covering every time in
+    the file (such as the default limits of a plot) can be served by the cached full read.
+
+    Args:
+        file_path (str): Path to the file.
+        time_column (int): Index of the time column in a data line.
+        t_min (float, optional): Lower time limit. Defaults to None.
+        t_max (float, optional): Upper time limit. Defaults to None.
+        use_cache (bool, optional): Persist the index in the cache. Defaults to True.
+
+    Returns:
+        Tuple[float, float]: t_min and t_max, each None if it keeps every line of the file.
+    """
+    offsets, times = time_index(file_path, time_column, use_cache=use_cache)
+    if len(offsets) == 0:
+        return t_min, t_max
+
+    if t_min is not None and t_min <= times[0]:
+        t_min = None
+    if t_max is not None and t_max >= times[-1] and t_max >= _last_line_time(file_path, time_column):
+        t_max = None
+    return t_min, t_max
+
+
+def window_mask(time, t_min: float = None, t_max: float = None) -> np.ndarray:
+    """
+    Boolean mask of t_min <= time <= t_max (either limit may be None).
+    """
+    time = np.asarray(time)
+    mask = np.ones(len(time), dtype=bool)
+    if t_min is not None:
+        mask &= time >= t_min
+    if t_max is not None:
+        mask &= time <= t_max
+    return mask
+
+
+def _line_time(line: bytes, time_column: int) -> float:
+    return float(line.split(maxsplit=time_column + 1)[time_column])
+
+
+def _last_line_time(file_path: str, time_column: int, chunk_size: int = 64 * 1024) -> float:
+    # time of the last complete line, reading back from the end of the file until it is found
+    with open(file_path, "rb") as f:
+        end = f.seek(0, os.SEEK_END)
+        while True:
+            position = max(end - chunk_size, 0)
+            f.seek(position)
+            data = f.read(end - position)
+            line_end = data.rfind(b"\n")
+            line_start = data.rfind(b"\n", 0, max(line_end, 0)) + 1
+            if line_start > 0 or position == 0:
+                break
+            chunk_size *= 2
+
+    return _line_time(data[line_start:line_end], time_column)